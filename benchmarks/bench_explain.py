@@ -0,0 +1,68 @@
+"""
+Offline benchmark for the Gemini explanation backend (src/explain.py).
+
+Starts the fake model server (src/fake_model_server.py), then explains a
+stream of requests drawn with a skew towards popular panchayats, the way
+dashboard traffic looks. Reports throughput, model calls and cache hit ratio
+for each batch size.
+
+    python benchmarks/bench_explain.py --requests 5000 --latency 0.2
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.data_fetcher import get_district_ranks  # noqa: E402
+from src.explain import GeminiExplainer  # noqa: E402
+from src.fake_model_server import start_fake_model_server  # noqa: E402
+from src.hierarchy import get_hierarchy  # noqa: E402
+from src.scoring import calculate_risk_score, default_scheme_inputs  # noqa: E402
+
+
+def make_items(count, rng):
+    h = get_hierarchy()
+    weights = [1 / (i + 1) for i in range(len(h.panchayats))]
+    items = []
+    for pid in rng.choices(range(len(h.panchayats)), weights=weights, k=count):
+        district, block, panchayat = h.path(pid)
+        ranks = get_district_ranks(district)
+        scheme_inputs = default_scheme_inputs(ranks)
+        scheme_inputs['mgnrega'] = rng.choice([scheme_inputs['mgnrega'], 200])
+        data = {'panchayat': panchayat, 'district': district, 'scheme_inputs': scheme_inputs, 'district_ranks': ranks}
+        items.append((calculate_risk_score(data)[0], data))
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cached, batched explanations against a fake model.")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--chunk', type=int, default=50, help="Items per explain_batch call")
+    parser.add_argument('--latency', type=float, default=0.2, help="Fake model seconds per call")
+    parser.add_argument('--rate', type=float, default=20.0, help="Model calls per second allowed")
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    args = parser.parse_args(argv)
+
+    server = start_fake_model_server(latency=args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    items = make_items(args.requests, random.Random(0))
+
+    for batch_size in (int(b) for b in args.batch_sizes.split(',')):
+        explainer = GeminiExplainer(base_url=base_url, api_key='', batch_size=batch_size, rate=args.rate, burst=int(args.rate))
+        start = time.perf_counter()
+        for i in range(0, len(items), args.chunk):
+            explainer.explain_batch(items[i:i + args.chunk])
+        elapsed = time.perf_counter() - start
+        stats = explainer.stats()
+        print(f"batch_size {batch_size:3d}: {len(items) / elapsed:8.0f} explanations/s, "
+              f"{stats['calls']} model calls, {stats['generated']} generated, {stats['fallbacks']} fallbacks, "
+              f"cache hit ratio {stats['cache']['hit_ratio']:.0%}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Offline benchmark for the data source pipeline (src/sources.py).
+
+Starts the fixture stub server (src/stub_server.py) with simulated latency,
+fetches every panchayat in the hierarchy twice through a fresh disk cache,
+and reports timings and per-source cache hit rates for the cold and warm pass.
+
+    python benchmarks/bench_fetch.py --latency 0.02 --fail-rate 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.hierarchy import get_hierarchy  # noqa: E402
+from src.sources import FetchPipeline  # noqa: E402
+from src.stub_server import start_stub_server  # noqa: E402
+
+
+def run_pass(pipeline, paths, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda p: pipeline.fetch(*p), paths))
+    elapsed = time.perf_counter() - start
+    incomplete = sum(1 for r in results if len(r) < 6)
+    return elapsed, incomplete
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fetch pipeline against the local stub server.")
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=8, help="Panchayats fetched at once")
+    args = parser.parse_args(argv)
+
+    h = get_hierarchy()
+    paths = [h.path(pid) for pid in range(len(h.panchayats))]
+    server = start_stub_server(latency=args.latency, fail_rate=args.fail_rate)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        pipeline = FetchPipeline(base_url, cache_dir)
+        for label in ('cold', 'warm'):
+            elapsed, incomplete = run_pass(pipeline, paths, args.concurrency)
+            print(f"{label}: {len(paths)} panchayats in {elapsed:.2f}s "
+                  f"({len(paths) / elapsed:.0f}/s, {incomplete} incomplete)")
+        for name, stats in sorted(pipeline.stats().items()):
+            print(f"  {name:14s} hits {stats['hits']:5d}  misses {stats['misses']:5d}  "
+                  f"stale {stats['stale']:3d}  hit rate {stats['hit_rate']:.0%}")
+        print(f"  coalesced      {pipeline.coalesced}")
+        pipeline.close()
+    print(f"upstream requests: {server.counts}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
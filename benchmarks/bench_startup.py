@@ -0,0 +1,125 @@
+"""
+Startup benchmark for the dashboard.
+
+Each sample runs in a fresh interpreter so nothing is already imported, and
+measures how long it takes until the first script run of app.py (which
+renders the sidebar) has finished. It also lists the heavy modules loaded by
+that first run, since those should only be imported after "Analyze Risk".
+
+    python benchmarks/bench_startup.py                      # report only
+    python benchmarks/bench_startup.py --budget 3.0         # fail above 3s
+    python benchmarks/bench_startup.py --save startup.json  # record a baseline
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+
+# Modules the first render must not import. Matched by exact name against the modules
+# loaded while app.py runs, so submodules count even when Streamlit preloaded their parent
+# (Streamlit itself imports plotly and plotly.graph_objects before any app runs).
+DEFERRED_MODULES = ('pandas', 'plotly.express', 'altair', 'pydeck', 'requests')
+
+_CHILD_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+app_modules_before = set(sys.modules)
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+t2 = time.perf_counter()
+print(json.dumps({
+    'streamlit_import_s': t1 - t0,
+    'first_render_s': t2 - t1,
+    'sidebar_ready_s': t2 - t0,
+    'exception': [str(e.value) for e in at.exception],
+    'sidebar_widgets': len(at.sidebar.selectbox),
+    'loaded_modules': sorted(set(sys.modules) - app_modules_before),
+    'preloaded_modules': sorted(m for m in sys.argv[2:] if m in app_modules_before),
+}))
+"""
+
+
+def run_sample():
+    """Runs one cold start in a subprocess and returns its measurements."""
+    out = subprocess.run(
+        [sys.executable, '-c', _CHILD_SCRIPT, APP_PATH, *DEFERRED_MODULES],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(repeat=5):
+    samples = [run_sample() for _ in range(repeat)]
+    errors = [e for s in samples for e in s['exception']]
+    loaded = sorted(set(samples[0]['loaded_modules']))
+    return {
+        'repeat': repeat,
+        'streamlit_import_s': statistics.median(s['streamlit_import_s'] for s in samples),
+        'first_render_s': statistics.median(s['first_render_s'] for s in samples),
+        'sidebar_ready_s': statistics.median(s['sidebar_ready_s'] for s in samples),
+        'deferred_modules_loaded': [m for m in DEFERRED_MODULES if m in loaded],
+        'deferred_modules_preloaded': samples[0]['preloaded_modules'],
+        'errors': errors,
+    }
+
+
+def check(result, budget=None, baseline=None, tolerance=0.25):
+    """Returns a list of failure messages for the result."""
+    failures = []
+    if result['errors']:
+        failures.append(f"app.py raised: {result['errors'][0]}")
+    if result['deferred_modules_loaded']:
+        failures.append(f"first render imported {', '.join(result['deferred_modules_loaded'])}")
+    if budget is not None and result['sidebar_ready_s'] > budget:
+        failures.append(f"sidebar ready in {result['sidebar_ready_s']:.3f}s, budget is {budget:.3f}s")
+    if baseline is not None:
+        limit = baseline['first_render_s'] * (1 + tolerance)
+        if result['first_render_s'] > limit:
+            failures.append(
+                f"first render {result['first_render_s']:.3f}s regressed past "
+                f"{limit:.3f}s (baseline {baseline['first_render_s']:.3f}s + {tolerance:.0%})"
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure dashboard cold-start time.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, help="Fail if the sidebar takes longer than this many seconds")
+    parser.add_argument('--baseline', help="Baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown over the baseline (0.25 = 25%%)")
+    parser.add_argument('--save', help="Write the result to this JSON file")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.repeat)
+    print(f"streamlit import: {result['streamlit_import_s']:.3f}s")
+    print(f"first render:     {result['first_render_s']:.3f}s")
+    print(f"sidebar ready:    {result['sidebar_ready_s']:.3f}s (median of {args.repeat})")
+    if result['deferred_modules_preloaded']:
+        # Loaded by Streamlit before app.py runs, so the check can't tell whether the app needs them
+        print(f"already loaded before the app: {', '.join(result['deferred_modules_preloaded'])}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failures = check(result, args.budget, baseline, args.tolerance)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Load test for the headless scoring API (src/api.py).
+
+Opens --concurrency keep-alive connections and sends requests for --duration
+seconds, then reports p50/p99 latency and requests (and records) per second.
+
+    python benchmarks/load_test.py --spawn                      # start a local server
+    python benchmarks/load_test.py --url http://127.0.0.1:8081  # use a running one
+    python benchmarks/load_test.py --spawn --batch-size 1000    # batch endpoint
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.hierarchy import get_hierarchy  # noqa: E402
+
+
+def make_records(count, rng):
+    h = get_hierarchy()
+    records = []
+    for _ in range(count):
+        district, block, panchayat = h.path(rng.randrange(len(h.panchayats)))
+        record = {'district': district, 'block': block, 'panchayat': panchayat}
+        if rng.random() < 0.5:
+            record['scheme_inputs'] = {
+                'magalir_urimai': rng.randint(0, 8000),
+                'old_age_pension': rng.randint(0, 3000),
+                'mgnrega': rng.randint(0, 9000),
+                'pongal_gift': rng.randint(0, 12000),
+            }
+        records.append(record)
+    return records
+
+
+async def _post(reader, writer, host, path, body):
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def _worker(url, path, bodies, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status = await _post(reader, writer, url.netloc, path, bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def run_load(url, concurrency, duration, batch_size, seed=0):
+    rng = random.Random(seed)
+    if batch_size:
+        path = '/v1/score/batch'
+        bodies = [json.dumps({'records': make_records(batch_size, rng)}).encode() for _ in range(8)]
+    else:
+        path = '/v1/score'
+        bodies = [json.dumps(r).encode() for r in make_records(2000, rng)]
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker(url, path, bodies, deadline, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    n = len(latencies)
+    return {
+        'requests': n,
+        'errors': len(errors),
+        'rps': n / elapsed,
+        'records_per_s': n * (batch_size or 1) / elapsed,
+        'p50_ms': latencies[n // 2] * 1000 if n else None,
+        'p99_ms': latencies[min(n - 1, int(n * 0.99))] * 1000 if n else None,
+    }
+
+
+def _wait_for_server(base_url, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/healthz', timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not come up")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the scoring API.")
+    parser.add_argument('--url', default='http://127.0.0.1:8081')
+    parser.add_argument('--spawn', action='store_true', help="Start a local server for the test")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--batch-size', type=int, default=0, help="Records per request; 0 uses the single endpoint")
+    args = parser.parse_args(argv)
+
+    url = urlparse(args.url)
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'src.api', '--host', url.hostname, '--port', str(url.port)],
+            cwd=REPO_ROOT, stdout=subprocess.DEVNULL
+        )
+    try:
+        _wait_for_server(args.url)
+        result = asyncio.run(run_load(url, args.concurrency, args.duration, args.batch_size))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"requests:   {result['requests']} ({result['errors']} errors)")
+    print(f"throughput: {result['rps']:.1f} req/s, {result['records_per_s']:.1f} records/s")
+    print(f"latency:    p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Benchmark suite for what users wait on: scoring, data loading, map geometry,
+explanations and full dashboard reruns.
+
+    python benchmarks/run.py                                   # run and print
+    python benchmarks/run.py --save benchmarks/baselines/baseline.json
+    python benchmarks/run.py --compare benchmarks/baselines/baseline.json --threshold 0.2
+    python benchmarks/run.py --filter scoring --quick
+
+--compare exits with status 1 if any benchmark's median is slower than the
+baseline by more than --threshold (0.2 = 20%). Times are per call; benchmarks
+registered with number > 1 loop that many calls inside each timed sample, so
+microsecond-scale calls aren't lost in timer noise.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+sys.path.insert(0, REPO_ROOT)
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=5, quick_repeat=None, number=1):
+    """
+    Registers a benchmark. The function does any setup and returns the callable
+    to time; each of the `repeat` samples calls it `number` times.
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, repeat, quick_repeat or min(repeat, 2), number)
+        return setup
+    return decorator
+
+
+# --- Scoring ---
+def _records(n, seed=0):
+    from src.data_fetcher import get_all_district_ranks, get_district_ranks
+    from src.scoring import SCHEME_COLUMNS
+
+    rng = random.Random(seed)
+    districts = list(get_all_district_ranks())
+    return [
+        {
+            'scheme_inputs': {s: rng.randint(0, 12000) for s in SCHEME_COLUMNS},
+            'district_ranks': get_district_ranks(rng.choice(districts)),
+        }
+        for _ in range(n)
+    ]
+
+
+def _per_record(n):
+    from src.scoring import calculate_risk_score
+
+    records = _records(n)
+    return lambda: [calculate_risk_score(r) for r in records]
+
+
+def _vectorized(n):
+    import numpy as np
+    from src.scoring import RANK_COLUMNS, SCHEME_COLUMNS, score_arrays
+
+    records = _records(min(n, 10000))
+    reps = -(-n // len(records))
+    schemes = np.tile(np.array([[r['scheme_inputs'][s] for s in SCHEME_COLUMNS] for r in records]), (reps, 1))[:n]
+    ranks = np.tile(np.array([[r['district_ranks'][c] for c in RANK_COLUMNS] for r in records]), (reps, 1))[:n]
+    return lambda: score_arrays(schemes, ranks)
+
+
+benchmark('scoring.per_record.1', repeat=20, number=10000)(lambda: _per_record(1))
+benchmark('scoring.per_record.1k', repeat=20, number=20)(lambda: _per_record(1000))
+benchmark('scoring.per_record.1m', repeat=1, quick_repeat=1)(lambda: _per_record(1000000))
+benchmark('scoring.vectorized.1k', repeat=20, number=1000)(lambda: _vectorized(1000))
+benchmark('scoring.vectorized.1m', repeat=5)(lambda: _vectorized(1000000))
+
+
+# --- Data Loading ---
+@benchmark('data.load_scheme_rankings', repeat=20, number=1000)
+def _load_rankings():
+    from src.data_fetcher import load_scheme_rankings
+    return load_scheme_rankings
+
+
+def _run_in_fresh_interpreter(code):
+    def run():
+        subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, check=True)
+    return run
+
+
+@benchmark('data.import_data_fetcher', repeat=5)
+def _import_data_fetcher():
+    # Includes interpreter startup; compare against python -c pass for the import cost alone
+    return _run_in_fresh_interpreter('import src.data_fetcher')
+
+
+@benchmark('data.interpreter_startup', repeat=5)
+def _interpreter_startup():
+    return _run_in_fresh_interpreter('pass')
+
+
+def _write_geojson_fixture(path, districts=38, vertices=4000, seed=0):
+    """Writes a Tamil Nadu-sized district GeoJSON in the format src/geo.py builds."""
+    import math
+    rng = random.Random(seed)
+    features, index = [], {}
+    for d in range(districts):
+        cx, cy = 76.5 + (d % 7) * 0.6, 8.2 + (d // 7) * 0.8
+        ring = []
+        for v in range(vertices):
+            angle = 2 * math.pi * v / vertices
+            radius = 0.25 + rng.random() * 0.02
+            ring.append([round(cx + radius * math.cos(angle), 4), round(cy + radius * math.sin(angle), 4)])
+        ring.append(ring[0])
+        name = f"District {d}"
+        index[name] = d
+        features.append({'type': 'Feature', 'id': name, 'properties': {'district': name},
+                         'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    with open(path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features, 'index': index}, f, separators=(',', ':'))
+
+
+@benchmark('geo.load_geojson', repeat=10)
+def _load_geojson():
+    from src.geo import load_tn_geojson
+    path = os.path.join(tempfile.mkdtemp(), 'tn_districts.geojson')
+    _write_geojson_fixture(path)
+    return lambda: load_tn_geojson(path)
+
+
+# --- Hex Map ---
+def _hex_points(n, seed=0):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return rng.uniform(8.0, 13.5, n), rng.uniform(76.2, 80.4, n), rng.integers(0, 101, n)
+
+
+@benchmark('hexbin.build.50k', repeat=10)
+def _hexbin_build():
+    from src.hexbin import HexBinner
+    lat, lon, _ = _hex_points(50000)
+    return lambda: HexBinner(lat, lon)
+
+
+@benchmark('hexbin.aggregate.50k', repeat=20)
+def _hexbin_aggregate():
+    from src.hexbin import RESOLUTIONS, HexBinner, to_records
+    lat, lon, risk = _hex_points(50000)
+    binner = HexBinner(lat, lon)
+    return lambda: [to_records(binner.aggregate(risk, r)) for r in range(len(RESOLUTIONS))]
+
+
+# --- Explanations ---
+@benchmark('explain.get_ai_reason.1k', repeat=20, number=20)
+def _get_ai_reason():
+    from src.explain import get_ai_reason
+    from src.scoring import calculate_risk_score
+
+    records = _records(1000)
+    for i, r in enumerate(records):
+        r['panchayat'] = f"Panchayat {i}"
+    scored = [(calculate_risk_score(r)[0], r) for r in records]
+    return lambda: [get_ai_reason(score, r) for score, r in scored]
+
+
+# --- Dashboard ---
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+
+    # Render the map from a fixture so the numbers don't depend on whether src/tn_districts.geojson was built
+    if 'TN_GEOJSON_PATH' not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(), 'tn_districts.geojson')
+        _write_geojson_fixture(path)
+        os.environ['TN_GEOJSON_PATH'] = path
+    return AppTest.from_file(APP_PATH, default_timeout=120)
+
+
+@benchmark('app.first_run', repeat=5)
+def _app_first_run():
+    def run():
+        at = _app_test().run()
+        assert not at.exception, at.exception
+    return run
+
+
+@benchmark('app.rerun_before_analyze', repeat=10)
+def _app_rerun_before():
+    at = _app_test().run()
+
+    def run():
+        at.run()
+        assert not at.exception, at.exception
+    return run
+
+
+@benchmark('app.analyze_click', repeat=5)
+def _app_analyze_click():
+    def run():
+        at = _app_test().run()
+        at.button[0].click().run()
+        assert not at.exception, at.exception
+    return run
+
+
+@benchmark('app.rerun_after_analyze', repeat=10)
+def _app_rerun_after():
+    at = _app_test().run()
+    at.button[0].click().run()
+
+    def run():
+        at.run()
+        assert not at.exception, at.exception
+    return run
+
+
+# --- Runner ---
+def run_benchmarks(names, quick=False):
+    results = {}
+    for name in names:
+        setup, repeat, quick_repeat, number = BENCHMARKS[name]
+        fn = setup()
+        fn() # warm-up, also catches errors before timing
+        loop = range(number)
+        times = []
+        for _ in range(quick_repeat if quick else repeat):
+            start = time.perf_counter()
+            for _ in loop:
+                fn()
+            times.append((time.perf_counter() - start) / number)
+        results[name] = {
+            'median_s': statistics.median(times),
+            'min_s': min(times),
+            'max_s': max(times),
+            'repeat': len(times),
+            'number': number,
+        }
+        print(f"{name:32s} median {results[name]['median_s'] * 1000:10.4f} ms   "
+              f"min {results[name]['min_s'] * 1000:10.4f} ms   (n={len(times)}x{number})")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns (name, baseline median, current median, change) for each regression past threshold."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None or base['median_s'] <= 0:
+            continue
+        change = result['median_s'] / base['median_s'] - 1
+        if change > threshold:
+            regressions.append((name, base['median_s'], result['median_s'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this string")
+    parser.add_argument('--quick', action='store_true', help="Fewer repetitions")
+    parser.add_argument('--save', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if not args.filter or args.filter in n]
+    results = run_benchmarks(names, args.quick)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, current, change in regressions:
+            print(f"REGRESSION {name}: {base * 1000:.3f} ms -> {current * 1000:.3f} ms (+{change:.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
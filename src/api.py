@@ -0,0 +1,269 @@
+"""
+Headless scoring API for systems that can't drive the Streamlit UI.
+
+    python -m src.api --port 8081
+
+Endpoints (JSON in, JSON out):
+    GET  /healthz
+    GET  /v1/stats
+    POST /v1/score        {"district", "block", "panchayat", "scheme_inputs"?}
+    POST /v1/score/batch  {"records": [...], "explain": false}
+
+scheme_inputs is optional and defaults to the rank-derived values the
+sidebar shows. The server is a small HTTP/1.1 (keep-alive) implementation on
+asyncio streams, so it needs nothing beyond the standard library.
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from src.data_fetcher import fetch_village_data, get_district_count, get_district_ranks
+from src.explain import get_explainer
+from src.scoring import SCHEME_COLUMNS, calculate_risk_score, default_scheme_inputs, score_arrays
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BATCH_RECORDS = 20000
+
+
+class ScoringService:
+    """
+    Scores panchayats with the same functions the dashboard uses.
+    Identical fetches that are in flight at the same time share one call
+    (request coalescing), and at most max_concurrency fetches run at once.
+    """
+
+    def __init__(self, max_concurrency: int = 32):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._in_flight = {}
+        self.stats = {'requests': 0, 'records': 0, 'fetches': 0, 'coalesced': 0}
+
+    @staticmethod
+    def _normalize(record) -> tuple:
+        if not isinstance(record, dict):
+            raise ValueError("Each record must be a JSON object.")
+        try:
+            district, block, panchayat = str(record['district']), str(record['block']), str(record['panchayat'])
+        except KeyError as e:
+            raise ValueError(f"Missing field: {e.args[0]}")
+        scheme_inputs = record.get('scheme_inputs')
+        if scheme_inputs is None:
+            scheme_inputs = default_scheme_inputs(get_district_ranks(district), get_district_count())
+        try:
+            values = tuple(int(scheme_inputs[s]) for s in SCHEME_COLUMNS)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            raise ValueError(f"scheme_inputs must have integer values for {', '.join(SCHEME_COLUMNS)}")
+        if min(values) < 0:
+            raise ValueError("scheme_inputs must not be negative")
+        return district, block, panchayat, values
+
+    async def _fetch(self, key: tuple) -> dict:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await future
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            district, block, panchayat, values = key
+            async with self._semaphore:
+                self.stats['fetches'] += 1
+                data = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, fetch_village_data, district, block, panchayat, dict(zip(SCHEME_COLUMNS, values))
+                )
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def score_one(self, record: dict) -> dict:
+        key = self._normalize(record)
+        self.stats['records'] += 1
+        data = await self._fetch(key)
+        risk_score, welfare_score, avg_rank = calculate_risk_score(data)
+        explainer = get_explainer()
+        if explainer.blocking:
+            explanation = await asyncio.get_running_loop().run_in_executor(
+                self._executor, explainer.explain, risk_score, data
+            )
+        else:
+            explanation = explainer.explain(risk_score, data)
+        return {
+            'district': data['district'],
+            'block': key[1],
+            'panchayat': data['panchayat'],
+            'risk_score': risk_score,
+            'welfare_score': welfare_score,
+            'avg_rank': avg_rank,
+            'explanation': explanation,
+        }
+
+    async def score_batch(self, records: list, explain: bool = False) -> list:
+        if not isinstance(records, list):
+            raise ValueError("'records' must be a list.")
+        if len(records) > MAX_BATCH_RECORDS:
+            raise ValueError(f"At most {MAX_BATCH_RECORDS} records per batch.")
+        keys = [self._normalize(r) for r in records]
+        self.stats['records'] += len(keys)
+
+        # Duplicate records within the batch are fetched once
+        unique = list(dict.fromkeys(keys))
+        fetched = dict(zip(unique, await asyncio.gather(*(self._fetch(k) for k in unique))))
+        datas = [fetched[k] for k in keys]
+        if not datas:
+            return []
+
+        rank_rows = [list(d['district_ranks'].values()) for d in datas]
+        if len({len(r) for r in rank_rows}) == 1:
+            risk, welfare, avg_rank = score_arrays([k[3] for k in keys], rank_rows, [d['n_districts'] for d in datas])
+        else:
+            # The rankings gained or lost a scheme mid-batch, so the rows don't stack
+            risk, welfare, avg_rank = zip(*(calculate_risk_score(d) for d in datas))
+        results = [
+            {
+                'district': key[0],
+                'block': key[1],
+                'panchayat': key[2],
+                'risk_score': int(risk[i]),
+                'welfare_score': int(welfare[i]),
+                'avg_rank': int(avg_rank[i]),
+            }
+            for i, key in enumerate(keys)
+        ]
+        if explain:
+            items = [(r['risk_score'], d) for r, d in zip(results, datas)]
+            explainer = get_explainer()
+            if explainer.blocking:
+                # LLM calls wait on the network and rate limiter, so keep them off the event loop
+                explanations = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, explainer.explain_batch, items
+                )
+            else:
+                explanations = explainer.explain_batch(items)
+            for result, explanation in zip(results, explanations):
+                result['explanation'] = explanation
+        return results
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        """Routes one request. Returns (status, payload)."""
+        self.stats['requests'] += 1
+        path = path.split('?', 1)[0]
+        if method == 'GET' and path == '/healthz':
+            return HTTPStatus.OK, {'status': 'ok'}
+        if method == 'GET' and path == '/v1/stats':
+            return HTTPStatus.OK, dict(self.stats, in_flight=len(self._in_flight))
+        if path not in ('/v1/score', '/v1/score/batch'):
+            return HTTPStatus.NOT_FOUND, {'error': f"No route for {path}"}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use POST"}
+
+        try:
+            payload = json.loads(body or b'{}')
+            if path == '/v1/score':
+                return HTTPStatus.OK, await self.score_one(payload)
+            if not isinstance(payload, dict):
+                raise ValueError("Body must be a JSON object.")
+            results = await self.score_batch(payload.get('records'), bool(payload.get('explain', False)))
+            return HTTPStatus.OK, {'results': results}
+        except ValueError as e: # includes JSONDecodeError
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+
+
+# --- HTTP Server ---
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise ConnectionError("Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return method, path, version, headers
+
+
+def _response(status: HTTPStatus, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+
+def make_handler(service: ScoringService):
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, version, headers = request
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Without a valid length the body can't be framed, so the connection is closed after the reply
+                    writer.write(_response(HTTPStatus.BAD_REQUEST, {'error': "Invalid Content-Length"}, False))
+                    await writer.drain()
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "Body too large"}, False))
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b''
+                status, payload = await service.dispatch(method, path, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+
+async def serve(host: str, port: int, max_concurrency: int = 32):
+    service = ScoringService(max_concurrency)
+    server = await asyncio.start_server(make_handler(service), host, port)
+    print(f"Scoring API listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the headless scoring API.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8081)))
+    parser.add_argument('--max-concurrency', type=int, default=32)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
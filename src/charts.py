@@ -0,0 +1,96 @@
+import threading
+
+from src.telemetry import cache_result
+
+# --- Shared Choropleth Cache ---
+# The district map is identical for every user and panchayat, so one figure is
+# built per rankings version and shared by all sessions in the process.
+_choropleth_lock = threading.Lock()
+_choropleth_cache = {'version': None, 'figure': None}
+_choropleth_stats = {'hits': 0, 'misses': 0}
+
+
+def build_district_choropleth(geojson: dict, all_ranks: dict):
+    """Builds the average-rank choropleth for all districts."""
+    # Imported here so importing this module for the heatmap doesn't load pandas
+    import pandas as pd
+    import plotly.express as px
+
+    map_data = []
+    for dist, ranks in all_ranks.items():
+        avg_rank = sum(ranks.values()) / len(ranks)
+        map_data.append({'District': dist, 'Average Rank': avg_rank})
+
+    df_map = pd.DataFrame(map_data)
+
+    fig = px.choropleth(
+        df_map,
+        geojson=geojson,
+        locations='District',
+        featureidkey="id",
+        color='Average Rank',
+        color_continuous_scale="RdYlGn_r", # Green (Low Rank) to Red (High Rank)
+        range_color=(1, max(len(all_ranks), 2)),
+        fitbounds="locations",
+        title="Avg Rank (Green=Good, Red=Bad)"
+    )
+    fig.update_geos(visible=False)
+    fig.update_layout(margin={"r":0,"t":30,"l":0,"b":0})
+    return fig
+
+
+def get_district_choropleth(geojson: dict, all_ranks: dict, version):
+    """
+    Returns the shared choropleth for a rankings version, building it only
+    when the version changes.
+    """
+    with _choropleth_lock:
+        if _choropleth_cache['figure'] is not None and _choropleth_cache['version'] == version:
+            _choropleth_stats['hits'] += 1
+            cache_result('district_choropleth', hit=True)
+            return _choropleth_cache['figure']
+        _choropleth_stats['misses'] += 1
+        cache_result('district_choropleth', hit=False)
+        fig = build_district_choropleth(geojson, all_ranks)
+        _choropleth_cache['version'] = version
+        _choropleth_cache['figure'] = fig
+        return fig
+
+
+def get_choropleth_cache_stats() -> dict:
+    """Returns hit/miss counts for the shared choropleth cache."""
+    with _choropleth_lock:
+        return dict(_choropleth_stats)
+
+
+def build_sensitivity_heatmap(x_values, y_values, risk, x_label: str, y_label: str, thresholds=(40, 65)):
+    """
+    Heatmap of risk scores over two swept scheme inputs, with contour lines at
+    the risk band thresholds. risk has shape (len(y_values), len(x_values)).
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=x_values, y=y_values, z=risk,
+        zmin=0, zmax=100,
+        colorscale="RdYlGn_r",
+        colorbar={'title': 'Risk'},
+        hovertemplate=f"{x_label}: %{{x}}<br>{y_label}: %{{y}}<br>Risk: %{{z}}<extra></extra>"
+    ))
+    for threshold in thresholds:
+        fig.add_trace(go.Contour(
+            x=x_values, y=y_values, z=risk,
+            contours={'start': threshold, 'end': threshold, 'size': 1, 'coloring': 'none',
+                      'showlabels': True, 'labelfont': {'color': 'black'}},
+            line={'color': 'black', 'width': 2},
+            showscale=False,
+            hoverinfo='skip',
+            name=f"Risk {threshold}"
+        ))
+    fig.update_layout(
+        xaxis_title=x_label, yaxis_title=y_label,
+        margin={"r":0,"t":30,"l":0,"b":0},
+        title=f"Risk Score (lines at {', '.join(str(t) for t in thresholds)})"
+    )
+    return fig
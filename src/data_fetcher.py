@@ -1,29 +1,21 @@
 import random
-import pandas as pd
 import os
 
+from src.ranking_store import RankingStore
+from src.telemetry import traced
+
 # --- Data Loading ---
+RANKINGS_PATH = os.path.join(os.path.dirname(__file__), 'district_scheme_ranking.csv')
+
 def load_scheme_rankings():
     """Loads the district scheme ranking data from the CSV file."""
-    # Correctly construct the path relative to this file's location
-    script_dir = os.path.dirname(__file__) 
-    file_path = os.path.join(script_dir, 'district_scheme_ranking.csv')
-    try:
-        df = pd.read_csv(file_path)
-        df.set_index('district', inplace=True)
-        return df.to_dict('index')
-    except FileNotFoundError:
-        # Return a default ranking if the file is missing
-        return {}
-
-SCHEME_RANKINGS = load_scheme_rankings()
+    return RankingStore(RANKINGS_PATH).as_dict()
 
-def fetch_village_data(district: str, block: str, panchayat: str, scheme_inputs: dict) -> dict:
-    """
-    Mocks fetching data for a given village panchayat and calculates risk based on scheme inputs.
-    In a real scenario, this would involve web scraping, database queries,
-    and API calls.
-    """
+# Shared, hot-reloading store: edits to the CSV are picked up without a restart
+RANKING_STORE = RankingStore(RANKINGS_PATH)
+
+def _mock_indicators(district: str) -> dict:
+    """Random local indicators, used when no data sources are configured."""
     # Mock data based on district to show some variation
     if district == "Madurai":
         active_cards = random.randint(350, 550)
@@ -47,34 +39,78 @@ def fetch_village_data(district: str, block: str, panchayat: str, scheme_inputs:
         yield_anomaly = -10
         price_trend = "down"
 
-    # Get the district's specific rankings
-    district_ranks = SCHEME_RANKINGS.get(district, {
-        'kalaignar_magalir_urimai_rank': 19, # Use average rank as default
-        'old_age_pension_rank': 19,
-        'mgnrega_rank': 19,
-        'pongal_gift_rank': 19
-    })
+    return {
+        'active_cards': active_cards,
+        'avg_wage': avg_wage,
+        'pension_coverage': pension_coverage,
+        'magalir_coverage': magalir_coverage,
+        'yield_anomaly': yield_anomaly,
+        'price_trend': price_trend
+    }
+
+@traced()
+def fetch_village_data(district: str, block: str, panchayat: str, scheme_inputs: dict) -> dict:
+    """
+    Fetches local indicators for a village panchayat and bundles them with the
+    scheme inputs and district rankings.
+    Indicators come from the data sources in src/sources.py when VILLAGE_DATA_URL
+    is set, and are mocked otherwise.
+    """
+    # Imported here so requests/bs4 aren't loaded until the first fetch
+    from src.sources import get_pipeline
+
+    pipeline = get_pipeline()
+    if pipeline is not None:
+        indicators = pipeline.fetch(district, block, panchayat)
+    else:
+        indicators = _mock_indicators(district)
+
+    # Get the district's specific rankings, and how many districts they rank against
+    snapshot = RANKING_STORE.snapshot()
+    district_ranks = snapshot.row(district)
 
     return {
         'panchayat': panchayat,
         'district': district,
         'scheme_inputs': scheme_inputs,
-        'district_ranks': district_ranks
+        'district_ranks': district_ranks,
+        'n_districts': snapshot.n_districts,
+        'rankings_version': snapshot.version,
+        'indicators': indicators
     }
 
-def get_district_ranks(district: str) -> dict:
+@traced()
+def get_district_ranks(district: str, as_of=None) -> dict:
     """
     Returns the scheme rankings for a specific district.
+    With as_of (a date or 'YYYY-MM'), returns the ranks from the latest
+    monthly snapshot in the rank history on or before that month.
     """
-    return SCHEME_RANKINGS.get(district, {
-        'kalaignar_magalir_urimai_rank': 19,
-        'old_age_pension_rank': 19,
-        'mgnrega_rank': 19,
-        'pongal_gift_rank': 19
-    })
+    if as_of is None:
+        return RANKING_STORE.row(district)
 
+    from src.rank_history import get_rank_history
+
+    snapshot = get_rank_history().snapshot_as_of(as_of)
+    if snapshot is None:
+        raise ValueError(f"No ranking snapshot on or before {as_of}")
+    return snapshot.row(district)
+
+@traced()
 def get_all_district_ranks() -> dict:
     """
     Returns the rankings for all districts.
     """
-    return SCHEME_RANKINGS
+    return RANKING_STORE.as_dict()
+
+def get_district_count() -> int:
+    """
+    Returns the number of ranked districts, i.e. the worst possible rank.
+    """
+    return RANKING_STORE.n_districts
+
+def get_rankings_version() -> str:
+    """
+    Returns an identifier that changes whenever the ranking data changes.
+    """
+    return RANKING_STORE.version
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class DiskCache:
+    """
+    JSON-on-disk cache with per-entry TTLs.
+    Entries are grouped by namespace (one directory each) so hit rates can be
+    reported per source. Writes go to a temp file and are renamed into place,
+    so concurrent readers never see a partial entry.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _path(self, namespace: str, key: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, namespace, digest[:2], digest + '.json')
+
+    def _count(self, namespace: str, outcome: str):
+        with self._lock:
+            counts = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'stale': 0})
+            counts[outcome] += 1
+
+    def _read(self, namespace: str, key: str):
+        try:
+            with open(self._path(namespace, key), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get(self, namespace: str, key: str, ttl: float, count: bool = True):
+        """
+        Returns the cached value, or None if it is missing or older than ttl seconds.
+        count=False leaves the hit/miss stats alone, for a re-check after a counted lookup.
+        """
+        entry = self._read(namespace, key)
+        if entry is None or time.time() - entry['stored_at'] > ttl:
+            if count:
+                self._count(namespace, 'misses')
+            return None
+        if count:
+            self._count(namespace, 'hits')
+        return entry['value']
+
+    def get_stale(self, namespace: str, key: str):
+        """Returns the cached value whatever its age, e.g. as a fallback when a refresh fails."""
+        entry = self._read(namespace, key)
+        if entry is None:
+            return None
+        self._count(namespace, 'stale')
+        return entry['value']
+
+    def set(self, namespace: str, key: str, value):
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'stored_at': time.time(), 'value': value}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def stats(self) -> dict:
+        """Returns hit/miss/stale counts and hit rate per namespace."""
+        with self._lock:
+            result = {}
+            for namespace, counts in self._stats.items():
+                lookups = counts['hits'] + counts['misses'] + counts['stale']
+                result[namespace] = dict(counts, hit_rate=counts['hits'] / lookups if lookups else 0.0)
+            return result
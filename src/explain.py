@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from src.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# EXPLAIN_BACKEND=gemini switches get_ai_reason to the LLM backend; the default is the templates.
+BACKEND_ENV = 'EXPLAIN_BACKEND'
+GEMINI_BASE_URL = os.environ.get('GEMINI_BASE_URL', 'https://generativelanguage.googleapis.com')
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-1.5-flash')
+
+
+def template_reason(score, data):
+    """Explains the score with fixed templates. This is the fast path and the fallback for the LLM backend."""
+    panchayat = data['panchayat']
+    schemes = data['scheme_inputs']
+    ranks = data['district_ranks']
+    
+    # Find the scheme with the highest beneficiaries
+    top_scheme = max(schemes, key=schemes.get)
+    top_count = schemes[top_scheme]
+    
+    # Find the best performing rank (lowest number)
+    best_rank_scheme = min(ranks, key=ranks.get)
+    best_rank = ranks[best_rank_scheme]
+
+    if score > 65:
+        reason = f"**High Risk Alert for {panchayat}:** The Resilience Score is critically high at **{score}**. This indicates a potential vulnerability despite the coverage in schemes like {top_scheme.replace('_', ' ').title()} ({top_count} beneficiaries). The district's ranking in key schemes needs improvement to bolster resilience. Immediate review of coverage gaps is advised."
+    elif 40 <= score <= 65:
+        reason = f"**Moderate Risk Warning for {panchayat}:** The Resilience Score is {score}. While there is substantial coverage, particularly in {top_scheme.replace('_', ' ').title()}, the overall district performance (best rank: {best_rank} in {best_rank_scheme.replace('_', ' ').title()}) suggests room for improvement. Recommend monitoring beneficiary uptake."
+    else:
+        reason = f"**Low Risk Profile for {panchayat}:** The Resilience Score is a healthy **{score}**. This reflects strong social security coverage, led by {top_scheme.replace('_', ' ').title()} with {top_count} beneficiaries. The district also performs well in {best_rank_scheme.replace('_', ' ').title()} (Rank {best_rank}). The panchayat shows good resilience to economic shocks."
+    return reason
+
+
+def score_band(score: int) -> str:
+    """Buckets a score the same way the templates do."""
+    if score > 65:
+        return 'high'
+    if score >= 40:
+        return 'moderate'
+    return 'low'
+
+
+def explanation_key(score, data) -> tuple:
+    """
+    Normalized cache key: (panchayat, score band, top scheme, best-rank scheme).
+    The LLM prompt is built from this key only, so equal keys get the same explanation.
+    """
+    schemes = data['scheme_inputs']
+    ranks = data['district_ranks']
+    return (data['panchayat'], score_band(score), max(schemes, key=schemes.get), min(ranks, key=ranks.get))
+
+
+# --- Backends ---
+class TemplateExplainer:
+    """The original f-string templates."""
+    blocking = False
+
+    def explain(self, score, data) -> str:
+        return template_reason(score, data)
+
+    def explain_batch(self, items) -> list:
+        return [template_reason(score, data) for score, data in items]
+
+    def stats(self) -> dict:
+        return {}
+
+
+class RateLimiter:
+    """Token bucket: allows `rate` calls per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class GeminiExplainer:
+    """
+    Explanations from a Gemini generateContent endpoint.
+    Several explanations are requested per call (batch_size), calls are
+    rate limited, and results sit behind an LRU+TTL cache keyed on
+    explanation_key(). Any failure falls back to the templates for the
+    affected items, and those fallbacks are not cached. After a failure the
+    backend is skipped for failure_cooldown seconds, so an outage costs one
+    timeout rather than one per rerun. Single explanations (the dashboard's
+    path) use the shorter interactive_timeout.
+    """
+    blocking = True
+
+    def __init__(self, base_url: str = GEMINI_BASE_URL, model: str = GEMINI_MODEL, api_key: str = None,
+                 batch_size: int = 16, rate: float = 5.0, burst: int = 5,
+                 cache_size: int = 4096, cache_ttl: float = 24 * 3600, timeout: float = 30.0,
+                 interactive_timeout: float = 3.0, failure_cooldown: float = 30.0):
+        import requests
+
+        self.url = f"{base_url.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.api_key = api_key if api_key is not None else os.environ.get('GEMINI_API_KEY', '')
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.interactive_timeout = interactive_timeout
+        self.failure_cooldown = failure_cooldown
+        self._retry_at = 0.0 # monotonic time before which calls are skipped after a failure
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.limiter = RateLimiter(rate, burst)
+        self.session = requests.Session()
+        self._stats_lock = threading.Lock()
+        self._stats = {'calls': 0, 'generated': 0, 'fallbacks': 0, 'failures': 0, 'skipped': 0}
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    @staticmethod
+    def _prompt(keys) -> str:
+        lines = [
+            "You are a micro-lending risk analyst in Tamil Nadu. For each village panchayat below, write a two or "
+            "three sentence explanation of its resilience (risk) band for a loan officer. Higher risk is worse.",
+            f"Return only a JSON array of {len(keys)} strings, in the same order.",
+            "",
+        ]
+        for i, (panchayat, band, top_scheme, best_rank_scheme) in enumerate(keys, 1):
+            lines.append(
+                f"{i}. Panchayat: {panchayat}; risk band: {band}; most beneficiaries: "
+                f"{top_scheme.replace('_', ' ').title()}; district's best-ranked scheme: "
+                f"{best_rank_scheme.replace('_', ' ').title()}"
+            )
+        return "\n".join(lines)
+
+    def _generate(self, keys, timeout: float) -> list:
+        self.limiter.acquire()
+        self._count('calls')
+        response = self.session.post(
+            self.url,
+            params={'key': self.api_key} if self.api_key else None,
+            json={
+                'contents': [{'role': 'user', 'parts': [{'text': self._prompt(keys)}]}],
+                'generationConfig': {'responseMimeType': 'application/json', 'temperature': 0.2},
+            },
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        text = response.json()['candidates'][0]['content']['parts'][0]['text']
+        explanations = json.loads(text)
+        if not isinstance(explanations, list) or len(explanations) != len(keys):
+            raise ValueError(f"Expected {len(keys)} explanations, got {text[:200]!r}")
+        return [str(e) for e in explanations]
+
+    def explain_batch(self, items, timeout: float = None) -> list:
+        """Explains a list of (score, data) pairs. timeout defaults to self.timeout."""
+        keys = [explanation_key(score, data) for score, data in items]
+        results = [self.cache.get(k) for k in keys]
+
+        missing = list(dict.fromkeys(k for k, r in zip(keys, results) if r is None))
+        generated = {}
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            if time.monotonic() < self._retry_at:
+                # Failed recently; the rest fall back to the templates without waiting on the backend
+                self._count('skipped', len(missing) - start)
+                break
+            try:
+                texts = self._generate(chunk, timeout or self.timeout)
+            except Exception as e:
+                logger.warning("Gemini explanation failed for %d items: %s", len(chunk), e)
+                self._retry_at = time.monotonic() + self.failure_cooldown
+                self._count('failures')
+                continue
+            self._count('generated', len(chunk))
+            for key, text in zip(chunk, texts):
+                self.cache.set(key, text)
+                generated[key] = text
+
+        for i, (key, (score, data)) in enumerate(zip(keys, items)):
+            if results[i] is None:
+                results[i] = generated.get(key)
+                if results[i] is None:
+                    self._count('fallbacks')
+                    results[i] = template_reason(score, data)
+        return results
+
+    def explain(self, score, data) -> str:
+        return self.explain_batch([(score, data)], self.interactive_timeout)[0]
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self._stats, cache=self.cache.stats())
+
+
+_explainer = None
+_explainer_lock = threading.Lock()
+
+
+def get_explainer():
+    """Returns the shared explanation backend selected by EXPLAIN_BACKEND."""
+    global _explainer
+    if _explainer is None:
+        with _explainer_lock:
+            if _explainer is None:
+                if os.environ.get(BACKEND_ENV, 'template').lower() == 'gemini':
+                    _explainer = GeminiExplainer()
+                else:
+                    _explainer = TemplateExplainer()
+    return _explainer
+
+
+def get_ai_reason(score, data):
+    """Explains the score using the configured backend."""
+    return get_explainer().explain(score, data)
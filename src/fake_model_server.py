@@ -0,0 +1,93 @@
+"""
+Local fake of the Gemini generateContent endpoint, for measuring the
+explanation backend (src/explain.py) without network access.
+
+    python -m src.fake_model_server --port 8770 --latency 0.3
+    EXPLAIN_BACKEND=gemini GEMINI_BASE_URL=http://127.0.0.1:8770 streamlit run app.py
+
+It answers each numbered item in the prompt with a canned sentence and
+returns them as a JSON array, like the real model is asked to. GET /_stats
+returns the number of calls and items generated.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ITEM_RE = re.compile(r'^\d+\. Panchayat: (.*?); risk band: (\w+);', re.MULTILINE)
+
+
+class FakeModelServer(ThreadingHTTPServer):
+    """HTTP server that fakes generateContent with a fixed latency per call."""
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.0):
+        super().__init__(address, _FakeModelHandler)
+        self.latency = latency
+        self.counts = {'calls': 0, 'items': 0}
+        self._lock = threading.Lock()
+
+
+class _FakeModelHandler(BaseHTTPRequestHandler):
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/_stats':
+            with self.server._lock:
+                return self._send(200, self.server.counts)
+        self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if not self.path.split('?', 1)[0].endswith(':generateContent'):
+            return self._send(404, {'error': 'not found'})
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        prompt = body['contents'][0]['parts'][0]['text']
+        items = _ITEM_RE.findall(prompt)
+        with self.server._lock:
+            self.server.counts['calls'] += 1
+            self.server.counts['items'] += len(items)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        texts = [
+            f"**{band.title()} risk for {panchayat}:** (fake model) Coverage and district rankings place this "
+            f"panchayat in the {band} band. Review scheme uptake before lending."
+            for panchayat, band in items
+        ]
+        self._send(200, {'candidates': [{'content': {'role': 'model', 'parts': [{'text': json.dumps(texts)}]}}]})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_model_server(port: int = 0, latency: float = 0.0) -> FakeModelServer:
+    """Starts the fake model server on a background thread. Use port 0 for any free port."""
+    server = FakeModelServer(('127.0.0.1', port), latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake Gemini generateContent endpoint.")
+    parser.add_argument('--port', type=int, default=8770)
+    parser.add_argument('--latency', type=float, default=0.3, help="Seconds per call")
+    args = parser.parse_args(argv)
+
+    server = FakeModelServer(('127.0.0.1', args.port), args.latency)
+    print(f"Fake model server on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
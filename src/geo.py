@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+
+# --- Geometry Source ---
+INDIA_DISTRICTS_URL = "https://raw.githubusercontent.com/geohacker/india/master/district/india_district.geojson"
+TN_GEOJSON_PATH = os.path.join(os.path.dirname(__file__), 'tn_districts.geojson')
+
+# The source GeoJSON spells some districts differently from district_scheme_ranking.csv
+DISTRICT_NAME_FIXES = {
+    "Kancheepuram": "Kanchipuram",
+    "Thiruvallur": "Tiruvallur",
+    "Thoothukkudi": "Thoothukudi",
+}
+
+COORDINATE_PRECISION = 4 # ~11m, plenty for a district map
+
+
+def _round_coordinates(coords, precision):
+    if isinstance(coords[0], (int, float)):
+        return [round(c, precision) for c in coords]
+    return [_round_coordinates(c, precision) for c in coords]
+
+
+def build_tn_geojson(india_geojson: dict, precision: int = COORDINATE_PRECISION) -> dict:
+    """
+    Filters the India district GeoJSON down to Tamil Nadu.
+    Each feature's id is the district name as used in the rankings CSV, so
+    the map can join on it directly. Other properties are dropped.
+    """
+    features = []
+    index = {}
+    for feature in india_geojson['features']:
+        props = feature['properties']
+        if props.get('NAME_1') != 'Tamil Nadu':
+            continue
+        district = DISTRICT_NAME_FIXES.get(props.get('NAME_2'), props.get('NAME_2'))
+        geometry = feature['geometry']
+        index[district] = len(features)
+        features.append({
+            'type': 'Feature',
+            'id': district,
+            'properties': {'district': district},
+            'geometry': {
+                'type': geometry['type'],
+                'coordinates': _round_coordinates(geometry['coordinates'], precision)
+            }
+        })
+    return {'type': 'FeatureCollection', 'features': features, 'index': index}
+
+
+def load_tn_geojson(path: str = None) -> dict:
+    """
+    Reads the pre-built Tamil Nadu district geometry. Returns None if it hasn't been built.
+    The TN_GEOJSON_PATH environment variable overrides the default location.
+    """
+    path = path or os.environ.get('TN_GEOJSON_PATH', TN_GEOJSON_PATH)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def get_district_feature(geojson: dict, district: str) -> dict:
+    """Returns the feature for a district using the pre-built index."""
+    position = geojson.get('index', {}).get(district)
+    if position is None:
+        return None
+    return geojson['features'][position]
+
+
+# --- Build Step ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Tamil Nadu district geometry file.")
+    parser.add_argument('--source', default=INDIA_DISTRICTS_URL,
+                        help="URL or local path of the India district GeoJSON")
+    parser.add_argument('--output', default=TN_GEOJSON_PATH)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.source):
+        with open(args.source, encoding='utf-8') as f:
+            india = json.load(f)
+    else:
+        import requests
+        response = requests.get(args.source, timeout=60)
+        response.raise_for_status()
+        india = response.json()
+
+    tn = build_tn_geojson(india)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(tn, f, separators=(',', ':'))
+    print(f"Wrote {len(tn['features'])} districts to {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+Server-side hexagonal binning of panchayat risk scores.
+
+Points are projected to kilometres around the centre of Tamil Nadu and
+binned into a pointy-top axial hex grid at a few fixed cell sizes, one per
+zoom band. Cell ids for the panchayats are computed once; a refresh of the
+risk scores is then a bincount per resolution, and only the aggregated cells
+are sent to the browser.
+
+Panchayat positions come from optional `lat`/`lon` columns in
+src/panchayats.csv. Panchayats without them are placed around their
+district's headquarters (src/district_centroids.csv) on a deterministic
+layout, so the map shows real district geography but not real panchayat
+positions until surveyed coordinates are added.
+"""
+import csv
+import math
+import os
+import threading
+
+import numpy as np
+
+from src.hierarchy import PANCHAYATS_PATH, get_hierarchy
+
+CENTROIDS_PATH = os.path.join(os.path.dirname(__file__), 'district_centroids.csv')
+
+# Cell size (centre to corner, km) per resolution, coarsest first
+RESOLUTIONS = (32.0, 16.0, 8.0, 4.0)
+
+# Projection origin near the middle of the state
+ORIGIN_LAT, ORIGIN_LON = 11.0, 78.5
+KM_PER_DEG_LAT = 110.57
+KM_PER_DEG_LON = 111.32 * math.cos(math.radians(ORIGIN_LAT))
+
+_ID_OFFSET = 1 << 20
+_ID_SPAN = 1 << 21
+
+
+# --- Hex Grid ---
+def project(lat, lon):
+    """Equirectangular projection to (x, y) kilometres from the origin."""
+    return (np.asarray(lon) - ORIGIN_LON) * KM_PER_DEG_LON, (np.asarray(lat) - ORIGIN_LAT) * KM_PER_DEG_LAT
+
+
+def unproject(x, y):
+    return ORIGIN_LAT + np.asarray(y) / KM_PER_DEG_LAT, ORIGIN_LON + np.asarray(x) / KM_PER_DEG_LON
+
+
+def hex_cells(lat, lon, size: float):
+    """Returns (q, r) axial coordinates of the cell containing each point."""
+    x, y = project(lat, lon)
+    q = (math.sqrt(3) / 3 * x - y / 3) / size
+    r = (2 / 3 * y) / size
+    # Cube rounding: round all three coordinates, then fix the one that moved most
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def cell_ids(lat, lon, size: float) -> np.ndarray:
+    """Packs the containing cell's axial coordinates into one int64 per point."""
+    q, r = hex_cells(lat, lon, size)
+    return (q + _ID_OFFSET) * _ID_SPAN + (r + _ID_OFFSET)
+
+
+def cell_centers(ids: np.ndarray, size: float):
+    """Returns (lat, lon) of the centres of packed cell ids."""
+    q = ids // _ID_SPAN - _ID_OFFSET
+    r = ids % _ID_SPAN - _ID_OFFSET
+    x = size * math.sqrt(3) * (q + r / 2)
+    y = size * 1.5 * r
+    return unproject(x, y)
+
+
+def resolution_for_zoom(zoom: float) -> int:
+    """Picks the resolution whose cells stay a sensible size on screen at a map zoom level."""
+    return int(np.clip(round(zoom) - 6, 0, len(RESOLUTIONS) - 1))
+
+
+# --- Panchayat Coordinates ---
+def load_district_centroids(path: str = CENTROIDS_PATH) -> dict:
+    with open(path, newline='', encoding='utf-8') as f:
+        return {r['district']: (float(r['lat']), float(r['lon'])) for r in csv.DictReader(f)}
+
+
+def panchayat_coordinates(hierarchy, centroids: dict, path: str = PANCHAYATS_PATH):
+    """
+    Returns (lat, lon, surveyed) arrays in panchayat-id order.
+    Uses lat/lon columns from the panchayats CSV where present (surveyed), otherwise a
+    placeholder position: blocks on a ring around the district headquarters
+    and panchayats on a small spiral around their block.
+    """
+    n = len(hierarchy.panchayats)
+    lat = np.full(n, np.nan)
+    lon = np.full(n, np.nan)
+    surveyed = np.zeros(n, dtype=bool)
+    golden_angle = math.pi * (3 - math.sqrt(5))
+    for d, district in enumerate(hierarchy.districts):
+        c_lat, c_lon = centroids.get(district, (ORIGIN_LAT, ORIGIN_LON))
+        blocks = hierarchy.block_ids(d)
+        for k, b in enumerate(blocks):
+            angle = 2 * math.pi * k / len(blocks)
+            b_lat = c_lat + 0.12 * math.sin(angle)
+            b_lon = c_lon + 0.12 * math.cos(angle)
+            for i, p in enumerate(hierarchy.panchayat_ids(b)):
+                radius = 0.03 * math.sqrt(i + 1)
+                lat[p] = b_lat + radius * math.sin(i * golden_angle)
+                lon[p] = b_lon + radius * math.cos(i * golden_angle)
+
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        if 'lat' in (reader.fieldnames or ()) and 'lon' in reader.fieldnames:
+            for r in reader:
+                if not r['lat'] or not r['lon']:
+                    continue
+                block_id = hierarchy.block_id(hierarchy.district_id(r['district']), r['block'])
+                p = hierarchy.panchayat_id(block_id, r['panchayat'])
+                lat[p], lon[p] = float(r['lat']), float(r['lon'])
+                surveyed[p] = True
+    return lat, lon, surveyed
+
+
+# --- Aggregation ---
+def risk_color(mean_risk: np.ndarray) -> np.ndarray:
+    """Green (0) -> yellow (50) -> red (100) RGB rows, matching the RdYlGn_r charts."""
+    t = np.clip(np.asarray(mean_risk, dtype=np.float64) / 100, 0, 1)
+    red = np.where(t < 0.5, 26 + t * 2 * (255 - 26), 255 - (t - 0.5) * 2 * (255 - 215))
+    green = np.where(t < 0.5, 152 + t * 2 * (255 - 152), 255 - (t - 0.5) * 2 * (255 - 48))
+    blue = np.where(t < 0.5, 80 + t * 2 * (191 - 80), 191 - (t - 0.5) * 2 * (191 - 39))
+    return np.stack([red, green, blue], axis=1).round().astype(np.uint8)
+
+
+class HexBinner:
+    """
+    Precomputed hex cells for a fixed set of points at every resolution.
+    aggregate() reduces a value per point to one row per occupied cell.
+    """
+
+    def __init__(self, lat, lon, resolutions=RESOLUTIONS):
+        self.resolutions = tuple(resolutions)
+        self.cells = []   # unique cell ids per resolution
+        self.inverse = [] # point -> index into cells, per resolution
+        for size in self.resolutions:
+            ids, inverse = np.unique(cell_ids(lat, lon, size), return_inverse=True)
+            self.cells.append(ids)
+            self.inverse.append(inverse.astype(np.int32))
+
+    def aggregate(self, values, resolution: int, high_threshold: int = 65) -> dict:
+        """
+        Returns column arrays for the occupied cells: lat, lon, count,
+        mean_risk, max_risk and high_risk (points at or above high_threshold).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        inverse = self.inverse[resolution]
+        n_cells = len(self.cells[resolution])
+        count = np.bincount(inverse, minlength=n_cells)
+        total = np.bincount(inverse, weights=values, minlength=n_cells)
+        high = np.bincount(inverse, weights=values >= high_threshold, minlength=n_cells)
+        max_risk = np.full(n_cells, -np.inf)
+        np.maximum.at(max_risk, inverse, values)
+        lat, lon = cell_centers(self.cells[resolution], self.resolutions[resolution])
+        return {
+            'lat': lat,
+            'lon': lon,
+            'count': count,
+            'mean_risk': total / np.maximum(count, 1),
+            'max_risk': max_risk,
+            'high_risk': high.astype(np.int64),
+        }
+
+
+def aggregate_points(lat, lon, values, resolution: int) -> dict:
+    """One-off binning of arbitrary points, e.g. a scored loan book."""
+    return HexBinner(lat, lon, RESOLUTIONS[resolution:resolution + 1]).aggregate(values, 0)
+
+
+def to_records(cells: dict) -> list:
+    """Compact per-cell records for the browser: rounded coordinates and scores, plus a fill colour."""
+    colors = risk_color(cells['mean_risk'])
+    return [
+        {'lat': round(float(la), 4), 'lon': round(float(lo), 4), 'count': int(c),
+         'mean_risk': round(float(m), 1), 'high_risk': int(h), 'color': [int(v) for v in rgb]}
+        for la, lo, c, m, h, rgb in zip(cells['lat'], cells['lon'], cells['count'],
+                                         cells['mean_risk'], cells['high_risk'], colors)
+    ]
+
+
+# --- Shared Panchayat Layer ---
+_binner = None
+_binner_lock = threading.Lock()
+_layer_cache = {}
+
+
+def get_panchayat_binner() -> HexBinner:
+    """Returns the hex cells of every panchayat, computed on first use."""
+    global _binner
+    if _binner is None:
+        with _binner_lock:
+            if _binner is None:
+                hierarchy = get_hierarchy()
+                lat, lon, surveyed = panchayat_coordinates(hierarchy, load_district_centroids())
+                binner = HexBinner(lat, lon)
+                binner.surveyed = int(surveyed.sum())
+                _binner = binner
+    return _binner
+
+
+def get_panchayat_hex_cells(resolution: int) -> list:
+    """
+    Aggregated panchayat risk per hex cell at a resolution, as records.
+    Cached per risk table version, so every session shares one aggregation.
+    """
+    from src.risk_table import get_risk_table
+
+    table = get_risk_table()
+    table.refresh()
+    key = (resolution, table.version)
+    records = _layer_cache.get(key)
+    if records is None:
+        records = to_records(get_panchayat_binner().aggregate(table.risk_score, resolution))
+        with _binner_lock:
+            # Keep only the current version's layers
+            for stale in [k for k in _layer_cache if k[1] != table.version]:
+                del _layer_cache[stale]
+            _layer_cache[key] = records
+    return records
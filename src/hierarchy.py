@@ -0,0 +1,156 @@
+import bisect
+import csv
+import difflib
+import os
+import re
+import threading
+
+import numpy as np
+
+# --- Data Loading ---
+PANCHAYATS_PATH = os.path.join(os.path.dirname(__file__), 'panchayats.csv')
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+class Hierarchy:
+    """
+    District -> block -> panchayat hierarchy with integer ids.
+    Ids are assigned so that each parent's children are contiguous, which lets
+    child lookups use offset arrays (CSR layout) instead of nested dicts.
+    """
+
+    def __init__(self, records):
+        district_ids = {}
+        block_ids = {}
+        grouped = {}
+        for district, block, panchayat in records:
+            d = district_ids.setdefault(district, len(district_ids))
+            b = block_ids.setdefault((d, block), len(block_ids))
+            grouped.setdefault(b, []).append(panchayat)
+
+        self.districts = tuple(district_ids)
+
+        # Order blocks by district (stable) so a district's blocks are contiguous
+        block_order = sorted(block_ids.items(), key=lambda item: item[0][0])
+        self.blocks = tuple(name for (_, name), _ in block_order)
+        self.block_district = np.array([d for (d, _), _ in block_order], dtype=np.int32)
+        self.district_offsets = np.searchsorted(self.block_district, np.arange(len(self.districts) + 1)).astype(np.int32)
+
+        panchayats = []
+        panchayat_block = []
+        for new_b, (_, old_b) in enumerate(block_order):
+            for name in grouped[old_b]:
+                panchayats.append(name)
+                panchayat_block.append(new_b)
+        self.panchayats = tuple(panchayats)
+        self.panchayat_block = np.array(panchayat_block, dtype=np.int32)
+        self.block_offsets = np.searchsorted(self.panchayat_block, np.arange(len(self.blocks) + 1)).astype(np.int32)
+
+        self._district_index = {name: i for i, name in enumerate(self.districts)}
+        self._search_index = None
+        self._search_lock = threading.Lock()
+
+    # --- Lookups ---
+    def district_id(self, name: str) -> int:
+        return self._district_index[name]
+
+    def block_ids(self, district_id: int) -> range:
+        return range(int(self.district_offsets[district_id]), int(self.district_offsets[district_id + 1]))
+
+    def panchayat_ids(self, block_id: int) -> range:
+        return range(int(self.block_offsets[block_id]), int(self.block_offsets[block_id + 1]))
+
+    def block_names(self, district_id: int) -> tuple:
+        return self.blocks[self.district_offsets[district_id]:self.district_offsets[district_id + 1]]
+
+    def panchayat_names(self, block_id: int) -> tuple:
+        return self.panchayats[self.block_offsets[block_id]:self.block_offsets[block_id + 1]]
+
+    def block_id(self, district_id: int, name: str) -> int:
+        return int(self.district_offsets[district_id]) + self.block_names(district_id).index(name)
+
+    def panchayat_id(self, block_id: int, name: str) -> int:
+        return int(self.block_offsets[block_id]) + self.panchayat_names(block_id).index(name)
+
+    def parent_block(self, panchayat_id: int) -> int:
+        return int(self.panchayat_block[panchayat_id])
+
+    def parent_district(self, block_id: int) -> int:
+        return int(self.block_district[block_id])
+
+    def path(self, panchayat_id: int) -> tuple:
+        """Returns (district, block, panchayat) names for a panchayat id."""
+        b = self.parent_block(panchayat_id)
+        return self.districts[self.parent_district(b)], self.blocks[b], self.panchayats[panchayat_id]
+
+    # --- Search ---
+    def _build_search_index(self):
+        # Every word of a name is indexed, so "thovalai" and "panchayat 2" both match
+        keys = []
+        for pid, name in enumerate(self.panchayats):
+            words = _normalize(name).split()
+            for i in range(len(words)):
+                keys.append((' '.join(words[i:]), pid))
+        keys.sort()
+        return [k for k, _ in keys], [pid for _, pid in keys]
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """
+        Returns panchayat ids whose name (or any word in it) starts with the query.
+        Falls back to fuzzy matching when nothing matches the prefix.
+        """
+        query = _normalize(query)
+        if not query:
+            return []
+        if self._search_index is None:
+            with self._search_lock:
+                if self._search_index is None:
+                    self._search_index = self._build_search_index()
+        keys, ids = self._search_index
+
+        results = []
+        seen = set()
+        start = bisect.bisect_left(keys, query)
+        for i in range(start, len(keys)):
+            if not keys[i].startswith(query) or len(results) >= limit:
+                break
+            if ids[i] not in seen:
+                seen.add(ids[i])
+                results.append(ids[i])
+        if results:
+            return results
+
+        # Fuzzy candidates are limited to keys sharing the first letter to keep this fast
+        lo = bisect.bisect_left(keys, query[0])
+        hi = bisect.bisect_left(keys, chr(ord(query[0]) + 1))
+        close = difflib.get_close_matches(query, keys[lo:hi], n=limit * 3, cutoff=0.6)
+        for key in close:
+            pid = ids[bisect.bisect_left(keys, key)]
+            if pid not in seen and len(results) < limit:
+                seen.add(pid)
+                results.append(pid)
+        return results
+
+
+def load_hierarchy(path: str = PANCHAYATS_PATH) -> Hierarchy:
+    """Loads the district/block/panchayat hierarchy from a CSV file."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        return Hierarchy((r['district'], r['block'], r['panchayat']) for r in reader)
+
+
+_hierarchy = None
+_hierarchy_lock = threading.Lock()
+
+
+def get_hierarchy() -> Hierarchy:
+    """Returns the shared hierarchy, loading it on first use."""
+    global _hierarchy
+    if _hierarchy is None:
+        with _hierarchy_lock:
+            if _hierarchy is None:
+                _hierarchy = load_hierarchy()
+    return _hierarchy
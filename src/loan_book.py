@@ -0,0 +1,219 @@
+"""
+Streaming batch scorer for a full loan book.
+
+    python -m src.loan_book loans.parquet scored.parquet --workers 8 \
+        --block-rollup blocks.csv --district-rollup districts.csv
+
+Each application needs district, block and panchayat columns. Scheme columns
+(magalir_urimai, old_age_pension, mgnrega, pongal_gift) are used when present;
+any that are missing are filled in with the district's rank-derived defaults,
+as in the dashboard. The book is read in fixed-size chunks and scored across a process
+pool; at most a few chunks are held in memory at any time, whatever the size
+of the input.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.data_fetcher import RANKING_STORE
+from src.scoring import SCHEME_COLUMNS, default_scheme_matrix, score_arrays
+
+KEY_COLUMNS = ['district', 'block', 'panchayat']
+HIGH_RISK_THRESHOLD = 65
+DEFAULT_CHUNK_SIZE = 100000
+
+# --- Worker State ---
+# Set once per worker process by _init_worker, so tasks only carry their chunk
+_district_index = None
+_rank_table = None
+_n_districts = None
+_rank_columns = None
+
+
+def _init_worker(districts, rank_matrix, n_districts, rank_columns):
+    """Installs the ranking table in a worker. The extra last row is the default for unknown districts."""
+    global _district_index, _rank_table, _n_districts, _rank_columns
+    import pandas as pd
+
+    _district_index = pd.Index(districts)
+    default_row = np.full((1, rank_matrix.shape[1]), (n_districts + 1) // 2, dtype=rank_matrix.dtype)
+    _rank_table = np.vstack([rank_matrix, default_row])
+    _n_districts = n_districts
+    _rank_columns = tuple(rank_columns)
+
+
+def score_chunk(chunk, amount_column=None):
+    """
+    Scores one chunk of applications.
+    Returns (scored chunk, per-block rollup) where the rollup has one row per
+    (district, block) with count, exposure, risk_sum and high_risk_exposure.
+    """
+    missing = [c for c in KEY_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    ids = _district_index.get_indexer(chunk['district'])
+    rank_matrix = _rank_table[ids].astype(np.int64) # -1 picks the default row
+
+    scored = chunk.copy()
+    if all(c in chunk.columns for c in SCHEME_COLUMNS):
+        scheme_matrix = chunk[SCHEME_COLUMNS].to_numpy()
+    else:
+        # Only the missing scheme columns get the rank-derived defaults; supplied ones are kept
+        defaults = default_scheme_matrix(rank_matrix, _n_districts, _rank_columns)
+        for j, scheme in enumerate(SCHEME_COLUMNS):
+            if scheme not in chunk.columns:
+                scored[scheme] = defaults[:, j].astype(np.int32)
+        scheme_matrix = scored[SCHEME_COLUMNS].to_numpy()
+    risk, welfare, avg_rank = score_arrays(scheme_matrix, rank_matrix, _n_districts)
+
+    scored['risk_score'] = risk.astype(np.int16)
+    scored['welfare_score'] = welfare.astype(np.int16)
+    scored['avg_rank'] = avg_rank.astype(np.int16)
+
+    exposure = chunk[amount_column].to_numpy(dtype=np.float64) if amount_column else np.ones(len(chunk))
+    parts = scored[['district', 'block']].assign(
+        count=1,
+        exposure=exposure,
+        risk_sum=risk,
+        high_risk_exposure=np.where(risk >= HIGH_RISK_THRESHOLD, exposure, 0.0),
+    )
+    rollup = parts.groupby(['district', 'block'], sort=False).sum()
+    return scored, rollup
+
+
+# --- Input ---
+def iter_chunks(path: str, chunk_size: int):
+    """Yields DataFrame chunks of a CSV or Parquet file without reading it whole."""
+    import pandas as pd
+
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        dtypes = {c: str for c in KEY_COLUMNS}
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=dtypes)
+
+
+class _ChunkWriter:
+    """Appends scored chunks to a Parquet or CSV file as they complete."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = os.path.splitext(path)[1].lower() == '.parquet'
+        self._writer = None
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, mode='a' if self._writer else 'w', header=not self._writer, index=False)
+            self._writer = True
+
+    def close(self):
+        if self.parquet and self._writer is not None:
+            self._writer.close()
+
+
+def _finish_rollup(rollup):
+    rollup = rollup.copy()
+    rollup['mean_risk'] = (rollup['risk_sum'] / rollup['count']).round(2)
+    rollup['high_risk_share'] = (rollup['high_risk_exposure'] / rollup['exposure']).fillna(0).round(4)
+    return rollup.drop(columns='risk_sum').reset_index()
+
+
+def score_loan_book(input_path: str, output_path: str, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    amount_column: str = None, progress=sys.stderr):
+    """
+    Scores a loan book chunk by chunk and writes the scored rows to output_path
+    in input order. Returns (block rollup, district rollup) DataFrames.
+    """
+    import pandas as pd
+
+    snapshot = RANKING_STORE.snapshot()
+    districts = list(snapshot.districts)
+    rank_matrix = snapshot.rank_matrix(districts)
+    workers = workers or os.cpu_count() or 1
+
+    writer = _ChunkWriter(output_path)
+    block_rollup = None
+    rows = 0
+    start = last_report = time.perf_counter()
+
+    def collect(scored, rollup):
+        nonlocal block_rollup, rows, last_report
+        writer.write(scored)
+        block_rollup = rollup if block_rollup is None else block_rollup.add(rollup, fill_value=0)
+        rows += len(scored)
+        now = time.perf_counter()
+        if progress and now - last_report >= 1.0:
+            print(f"{rows:,} rows  {rows / (now - start):,.0f} rows/s", file=progress)
+            last_report = now
+
+    try:
+        chunks = iter_chunks(input_path, chunk_size)
+        if workers == 1:
+            _init_worker(districts, rank_matrix, snapshot.n_districts, snapshot.schemes)
+            for chunk in chunks:
+                collect(*score_chunk(chunk, amount_column))
+        else:
+            # Bounded queue of in-flight chunks, drained oldest first so output keeps input order
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(districts, rank_matrix, snapshot.n_districts, snapshot.schemes)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(score_chunk, chunk, amount_column))
+                    if len(pending) >= 2 * workers:
+                        collect(*pending.popleft().result())
+                while pending:
+                    collect(*pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    if progress:
+        print(f"Scored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)", file=progress)
+
+    if block_rollup is None:
+        columns = ['count', 'exposure', 'risk_sum', 'high_risk_exposure']
+        block_rollup = pd.DataFrame(columns=columns, index=pd.MultiIndex.from_tuples([], names=['district', 'block']))
+    block_rollup = block_rollup.astype({'count': np.int64, 'risk_sum': np.int64})
+    district_rollup = block_rollup.groupby(level='district').sum()
+    return _finish_rollup(block_rollup), _finish_rollup(district_rollup)
+
+
+# --- Command Line Entry Point ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream-score a loan book across a process pool.")
+    parser.add_argument('input', help="Input .csv or .parquet with district, block and panchayat columns")
+    parser.add_argument('output', help="Output .parquet (or .csv) file")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count; 1 = in-process)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument('--amount-column', default=None,
+                        help="Loan amount column for exposure; without it exposure counts applications")
+    parser.add_argument('--block-rollup', help="Write per-block exposure to this CSV")
+    parser.add_argument('--district-rollup', help="Write per-district exposure to this CSV")
+    args = parser.parse_args(argv)
+
+    blocks, districts = score_loan_book(args.input, args.output, args.workers, args.chunk_size, args.amount_column)
+    if args.block_rollup:
+        blocks.to_csv(args.block_rollup, index=False)
+    if args.district_rollup:
+        districts.to_csv(args.district_rollup, index=False)
+    print(f"Wrote scored rows -> {args.output} ({len(blocks)} blocks, {len(districts)} districts)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""
+Append-only history of monthly district ranking snapshots.
+
+    python -m src.rank_history append 2026-09                 # current rankings CSV as Sept 2026
+    python -m src.rank_history append 2026-10 --csv ranks.csv
+    python -m src.rank_history show Madurai mgnrega_rank --months 24
+
+Layout, in $RANK_HISTORY_DIR (default src/rank_history/):
+    meta.json          districts, schemes, the number of committed snapshots and the file generation
+    months.i32         one yyyymm integer per snapshot, strictly increasing
+    <scheme>.i16       one row of district ranks per snapshot (0 = district missing);
+                       <scheme>.g<n>.i16 after the n-th time districts were added
+
+Every file is append-only and read through np.memmap, so queries only touch
+the pages they need. meta.json is rewritten last on append; readers trust its
+count, so a crashed append leaves the committed history intact.
+
+A snapshot with a new scheme starts a new file, back-filled as missing. A
+snapshot with a new district (e.g. after a split) widens every row, so the
+scheme files are rewritten once at the new width under the next generation's
+names and meta.json is switched to them; earlier snapshots show the new
+district as missing.
+"""
+import argparse
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+
+from src.ranking_store import RankingSnapshot
+
+RANK_HISTORY_DIR = os.environ.get('RANK_HISTORY_DIR', os.path.join(os.path.dirname(__file__), 'rank_history'))
+MISSING_RANK = 0
+
+
+def to_month(value) -> int:
+    """Normalizes a date, 'YYYY-MM', 'YYYY-MM-DD' or yyyymm int to a yyyymm int."""
+    if isinstance(value, (int, np.integer)):
+        month = int(value)
+    elif isinstance(value, (datetime.date, datetime.datetime)):
+        month = value.year * 100 + value.month
+    else:
+        parts = str(value).strip().split('-')
+        if len(parts) < 2:
+            raise ValueError(f"Expected a YYYY-MM date, got {value!r}")
+        month = int(parts[0]) * 100 + int(parts[1])
+    if not 1 <= month % 100 <= 12:
+        raise ValueError(f"Invalid month: {value!r}")
+    return month
+
+
+def add_months(month: int, months: int) -> int:
+    """Shifts a yyyymm month by a number of months."""
+    total = (month // 100) * 12 + (month % 100 - 1) + months
+    return (total // 12) * 100 + total % 12 + 1
+
+
+def format_month(month: int) -> str:
+    return f"{month // 100:04d}-{month % 100:02d}"
+
+
+class RankHistory:
+    """
+    Monthly ranking snapshots. Districts and schemes are added as snapshots
+    bring them; appends from another process are picked up on the next query.
+    """
+
+    def __init__(self, directory: str = RANK_HISTORY_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._meta_stat = None
+        self.districts = ()
+        self.schemes = ()
+        self.index = {}
+        self.generation = 0
+        self._months = np.zeros(0, dtype=np.int32)
+        self._ranks = {}
+
+    @classmethod
+    def create(cls, directory: str, districts, schemes) -> 'RankHistory':
+        """Initializes an empty history for the given districts and schemes."""
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(os.path.join(directory, 'meta.json')):
+            raise FileExistsError(f"A rank history already exists in {directory}")
+        for name in ['months.i32'] + [f"{s}.i16" for s in schemes]:
+            open(os.path.join(directory, name), 'wb').close()
+        history = cls(directory)
+        history._write_meta({'districts': list(districts), 'schemes': list(schemes), 'count': 0})
+        return history
+
+    # --- Storage ---
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def _scheme_file(scheme: str, generation: int = 0) -> str:
+        return f"{scheme}.g{generation}.i16" if generation else f"{scheme}.i16"
+
+    def _write_meta(self, meta: dict):
+        tmp = self._path('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path('meta.json'))
+
+    def _map(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode='r', shape=shape)
+
+    def _sync(self):
+        """Re-maps the files when meta.json has changed since the last query."""
+        try:
+            stat = os.stat(self._path('meta.json'))
+            current = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            current = None
+        if current == self._meta_stat:
+            return
+        with self._lock:
+            if current == self._meta_stat:
+                return
+            if current is None:
+                self.districts, self.schemes, self.index, self.generation = (), (), {}, 0
+                self._months, self._ranks = np.zeros(0, dtype=np.int32), {}
+            else:
+                with open(self._path('meta.json')) as f:
+                    meta = json.load(f)
+                count = meta['count']
+                self.districts = tuple(meta['districts'])
+                self.schemes = tuple(meta['schemes'])
+                self.index = {d: i for i, d in enumerate(self.districts)}
+                self.generation = meta.get('generation', 0)
+                self._months = self._map('months.i32', np.int32, (count,))
+                self._ranks = {
+                    s: self._map(self._scheme_file(s, self.generation), np.int16, (count, len(self.districts)))
+                    for s in self.schemes
+                }
+            self._meta_stat = current
+
+    def __len__(self):
+        self._sync()
+        return len(self._months)
+
+    @property
+    def months(self) -> np.ndarray:
+        self._sync()
+        return self._months
+
+    def append(self, month, rows: dict):
+        """
+        Appends one snapshot. rows maps district -> {scheme: rank}, like
+        RankingSnapshot.as_dict(); districts or schemes not given are stored as missing.
+        New districts and schemes are added to the history first (see _extend).
+        """
+        month = to_month(month)
+        self._sync()
+        if not self.districts:
+            raise FileNotFoundError(f"No rank history in {self.directory}; create it first")
+        if len(self._months) and month <= self._months[-1]:
+            raise ValueError(f"Snapshots are append-only: {format_month(month)} is not after "
+                             f"{format_month(int(self._months[-1]))}")
+
+        with open(self._path('meta.json')) as f:
+            meta = json.load(f)
+        new_districts = [d for d in rows if d not in meta['districts']]
+        new_schemes = list(dict.fromkeys(s for ranks in rows.values() for s in ranks if s not in meta['schemes']))
+        if new_districts or new_schemes:
+            meta = self._extend(meta, new_districts, new_schemes)
+        count = meta['count']
+        districts, schemes, generation = meta['districts'], meta['schemes'], meta.get('generation', 0)
+        index = {d: i for i, d in enumerate(districts)}
+
+        matrix = np.full((len(schemes), len(districts)), MISSING_RANK, dtype=np.int16)
+        for district, ranks in rows.items():
+            for j, scheme in enumerate(schemes):
+                if scheme in ranks:
+                    matrix[j, index[district]] = ranks[scheme]
+
+        # Truncate anything past the committed count left by an interrupted append
+        with open(self._path('months.i32'), 'r+b') as f:
+            f.truncate(count * 4)
+            f.seek(0, os.SEEK_END)
+            f.write(np.array([month], dtype=np.int32).tobytes())
+        for j, scheme in enumerate(schemes):
+            with open(self._path(self._scheme_file(scheme, generation)), 'r+b') as f:
+                f.truncate(count * len(districts) * 2)
+                f.seek(0, os.SEEK_END)
+                f.write(matrix[j].tobytes())
+        meta['count'] = count + 1
+        self._write_meta(meta)
+        self._meta_stat = None
+
+    def _extend(self, meta: dict, new_districts: list, new_schemes: list) -> dict:
+        """
+        Adds districts and schemes to the committed history and returns the new
+        meta. Earlier snapshots hold them as missing. Adding districts rewrites
+        every scheme file at the new row width under the next generation's
+        names; the switch happens when meta.json is replaced, so a crash before
+        that leaves the old files and history in use.
+        """
+        count = meta['count']
+        generation = meta.get('generation', 0)
+        old_schemes, old_width = meta['schemes'], len(meta['districts'])
+        districts = meta['districts'] + new_districts
+        schemes = old_schemes + new_schemes
+        target = generation + 1 if new_districts else generation
+
+        if new_districts:
+            for scheme in old_schemes:
+                old = np.fromfile(self._path(self._scheme_file(scheme, generation)), dtype=np.int16,
+                                  count=count * old_width).reshape(count, old_width)
+                widened = np.full((count, len(districts)), MISSING_RANK, dtype=np.int16)
+                widened[:, :old_width] = old
+                widened.tofile(self._path(self._scheme_file(scheme, target)))
+        for scheme in new_schemes:
+            np.full((count, len(districts)), MISSING_RANK, dtype=np.int16).tofile(
+                self._path(self._scheme_file(scheme, target)))
+
+        meta = dict(meta, districts=districts, schemes=schemes, generation=target)
+        self._write_meta(meta)
+        self._meta_stat = None
+        if target != generation:
+            for scheme in old_schemes:
+                try:
+                    os.remove(self._path(self._scheme_file(scheme, generation)))
+                except OSError:
+                    # Still mapped by a reader on a platform that can't delete open files; unused from now on
+                    pass
+        return meta
+
+    # --- Queries ---
+    def _range(self, start=None, end=None) -> slice:
+        """Index range of snapshots with start <= month <= end."""
+        months = self.months
+        lo = 0 if start is None else int(np.searchsorted(months, to_month(start), side='left'))
+        hi = len(months) if end is None else int(np.searchsorted(months, to_month(end), side='right'))
+        return slice(lo, hi)
+
+    def series(self, district: str, scheme: str, start=None, end=None):
+        """Returns (months, ranks) for one district and scheme; missing ranks are NaN."""
+        self._sync()
+        span = self._range(start, end)
+        ranks = np.asarray(self._ranks[scheme][span, self.index[district]], dtype=np.float64)
+        ranks[ranks == MISSING_RANK] = np.nan
+        return np.array(self._months[span]), ranks
+
+    def last(self, district: str, scheme: str, months: int = 24, end=None):
+        """series() over the `months` months ending at end (default: the latest snapshot)."""
+        history = self.months
+        if not len(history):
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        end = to_month(end) if end is not None else int(history[-1])
+        return self.series(district, scheme, add_months(end, 1 - months), end)
+
+    def deltas(self, district: str, scheme: str, start=None, end=None):
+        """Rank change from each snapshot to the next: (months of the later snapshot, change)."""
+        months, ranks = self.series(district, scheme, start, end)
+        return months[1:], np.diff(ranks)
+
+    def rolling_mean(self, district: str, scheme: str, window: int = 3, start=None, end=None):
+        """Mean rank over the trailing `window` snapshots, ignoring missing ones."""
+        months, ranks = self.series(district, scheme, start, end)
+        if len(ranks) < window:
+            return months[:0], ranks[:0]
+        valid = ~np.isnan(ranks)
+        sums = np.concatenate([[0.0], np.cumsum(np.where(valid, ranks, 0.0))])
+        counts = np.concatenate([[0], np.cumsum(valid)])
+        window_counts = counts[window:] - counts[:-window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (sums[window:] - sums[:-window]) / window_counts
+        return months[window - 1:], means
+
+    def snapshot_as_of(self, as_of) -> RankingSnapshot:
+        """The latest snapshot on or before as_of, or None if there is none."""
+        self._sync()
+        i = int(np.searchsorted(self._months, to_month(as_of), side='right')) - 1
+        if i < 0:
+            return None
+        ranks = np.stack([self._ranks[s][i] for s in self.schemes], axis=1)
+        # Districts and schemes added after this month are left out rather than ranked 0
+        present = np.any(ranks != MISSING_RANK, axis=1)
+        ranked = np.any(ranks != MISSING_RANK, axis=0)
+        districts = [d for d, p in zip(self.districts, present) if p]
+        schemes = [s for s, r in zip(self.schemes, ranked) if r]
+        return RankingSnapshot(districts, schemes, np.array(ranks[np.ix_(present, ranked)]), f"history:{int(self._months[i])}")
+
+
+_rank_history = None
+_rank_history_lock = threading.Lock()
+
+
+def get_rank_history() -> RankHistory:
+    """Returns the shared rank history for RANK_HISTORY_DIR."""
+    global _rank_history
+    if _rank_history is None:
+        with _rank_history_lock:
+            if _rank_history is None:
+                _rank_history = RankHistory(RANK_HISTORY_DIR)
+    return _rank_history
+
+
+# --- Command Line Entry Point ---
+def main(argv=None):
+    from src.data_fetcher import RANKINGS_PATH
+    from src.ranking_store import RankingStore
+
+    parser = argparse.ArgumentParser(description="Append to or query the monthly rank history.")
+    parser.add_argument('--dir', default=RANK_HISTORY_DIR, help="History directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    append = commands.add_parser('append', help="Append a rankings CSV as the snapshot for a month")
+    append.add_argument('month', help="YYYY-MM")
+    append.add_argument('--csv', default=RANKINGS_PATH, help="Rankings CSV (default: the app's current one)")
+    show = commands.add_parser('show', help="Print one district's rank for a scheme")
+    show.add_argument('district')
+    show.add_argument('scheme')
+    show.add_argument('--months', type=int, default=24)
+    args = parser.parse_args(argv)
+
+    history = RankHistory(args.dir)
+    if args.command == 'append':
+        snapshot = RankingStore(args.csv).snapshot()
+        if not len(history):
+            if not os.path.exists(os.path.join(args.dir, 'meta.json')):
+                history = RankHistory.create(args.dir, snapshot.districts, snapshot.schemes)
+        history.append(args.month, snapshot.as_dict())
+        print(f"Appended {format_month(to_month(args.month))} ({len(snapshot)} districts); {len(history)} snapshots")
+    else:
+        months, ranks = history.last(args.district, args.scheme, args.months)
+        for month, rank in zip(months, ranks):
+            print(f"{format_month(int(month))}  {'-' if np.isnan(rank) else int(rank)}")
+
+
+if __name__ == '__main__':
+    main()
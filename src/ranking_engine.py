@@ -0,0 +1,155 @@
+"""
+Derives district ranks from raw scheme coverage figures.
+
+    python -m src.ranking_engine coverage.csv                  # rewrites src/district_scheme_ranking.csv
+    python -m src.ranking_engine coverage.csv -o ranks.csv
+
+coverage.csv has a 'district' column and one column per scheme with a
+coverage figure where higher is better, e.g. beneficiaries per eligible
+person. Scheme column `x` becomes rank column `x_rank`, so
+`kalaignar_magalir_urimai`, `old_age_pension`, `mgnrega` and `pongal_gift`
+produce the columns the app reads. Any number of schemes and districts work;
+scores are normalized by the number of districts ranked.
+
+Ranks are 1 for the best coverage, ties share the better rank, and
+districts without a figure for a scheme rank after every district with one.
+"""
+import argparse
+import bisect
+import csv
+import io
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from src.ranking_store import RankingSnapshot
+
+
+class RankingEngine:
+    """
+    Coverage figures per scheme, each with a sorted index of values.
+    An update moves one value within its scheme's index (a bisect delete and
+    insert) instead of re-sorting the column, and a rank is a bisect lookup.
+    """
+
+    def __init__(self, schemes):
+        self.schemes = tuple(schemes)
+        self.coverage = {s: {} for s in self.schemes}
+        # Negated values in ascending order, so better coverage sorts first
+        self._sorted = {s: [] for s in self.schemes}
+        self._districts = {}
+        self.updates = 0
+
+    @property
+    def districts(self) -> tuple:
+        return tuple(self._districts)
+
+    @property
+    def n_districts(self) -> int:
+        return len(self._districts)
+
+    @property
+    def rank_columns(self) -> tuple:
+        return tuple(f"{s}_rank" for s in self.schemes)
+
+    def update(self, district: str, scheme: str, value):
+        """Sets one coverage figure. None (or NaN) clears it."""
+        self._districts.setdefault(district, None)
+        values = self.coverage[scheme]
+        index = self._sorted[scheme]
+        old = values.pop(district, None)
+        if old is not None:
+            del index[bisect.bisect_left(index, -old)]
+        if value is not None and not (isinstance(value, float) and math.isnan(value)):
+            value = float(value)
+            values[district] = value
+            bisect.insort(index, -value)
+        self.updates += 1
+
+    def update_row(self, district: str, coverage: dict):
+        """Sets several schemes' figures for one district."""
+        for scheme, value in coverage.items():
+            self.update(district, scheme, value)
+
+    def remove_district(self, district: str):
+        """Drops a district from every scheme, e.g. after it is split."""
+        for scheme in self.schemes:
+            self.update(district, scheme, None)
+        del self._districts[district]
+
+    def rank(self, district: str, scheme: str) -> int:
+        value = self.coverage[scheme].get(district)
+        index = self._sorted[scheme]
+        if value is None:
+            return len(index) + 1
+        return bisect.bisect_left(index, -value) + 1
+
+    def row(self, district: str) -> dict:
+        """Ranks for one district, keyed by rank column like RankingSnapshot.row()."""
+        return {col: self.rank(district, s) for s, col in zip(self.schemes, self.rank_columns)}
+
+    def snapshot(self, version: str = '') -> RankingSnapshot:
+        """All current ranks as a RankingSnapshot."""
+        ranks = np.array(
+            [[self.rank(d, s) for s in self.schemes] for d in self._districts],
+            dtype=np.int16
+        ).reshape(len(self._districts), len(self.schemes))
+        return RankingSnapshot(self._districts, self.rank_columns, ranks, version or f"engine:{self.updates}")
+
+    def to_csv(self) -> str:
+        """Ranks in the district_scheme_ranking.csv format."""
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(('district',) + self.rank_columns)
+        for district in self._districts:
+            writer.writerow([district] + [self.rank(district, s) for s in self.schemes])
+        return out.getvalue()
+
+
+def load_coverage_csv(path: str) -> RankingEngine:
+    """Builds an engine from a coverage CSV: 'district' plus one numeric column per scheme."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        schemes = [c for c in reader.fieldnames or () if c != 'district']
+        if 'district' not in (reader.fieldnames or ()) or not schemes:
+            raise ValueError("Expected a 'district' column and at least one scheme column.")
+        engine = RankingEngine(schemes)
+        for record in reader:
+            engine.update_row(record['district'].strip(), {
+                s: float(record[s]) if record[s] not in (None, '') else None for s in schemes
+            })
+    return engine
+
+
+def write_rankings(engine: RankingEngine, path: str):
+    """Writes the rankings CSV atomically, so the app's hot reload never sees a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(engine.to_csv())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+# --- Command Line Entry Point ---
+def main(argv=None):
+    from src.data_fetcher import RANKINGS_PATH
+
+    parser = argparse.ArgumentParser(description="Rank districts from raw scheme coverage.")
+    parser.add_argument('coverage', help="Coverage CSV: 'district' plus one column per scheme (higher is better)")
+    parser.add_argument('-o', '--output', default=RANKINGS_PATH, help="Rankings CSV to write (default: the app's)")
+    args = parser.parse_args(argv)
+
+    engine = load_coverage_csv(args.coverage)
+    write_rankings(engine, args.output)
+    print(f"Ranked {engine.n_districts} districts on {len(engine.schemes)} schemes -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import csv
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# --- Defaults ---
+DEFAULT_N_DISTRICTS = 38 # Used when no rankings are loaded
+DEFAULT_RANK_COLUMNS = ('kalaignar_magalir_urimai_rank', 'old_age_pension_rank', 'mgnrega_rank', 'pongal_gift_rank')
+
+
+class RankingSnapshot:
+    """
+    One immutable load of the rankings CSV.
+    Districts are mapped to integer ids, and ranks live in a (districts, schemes)
+    int16 array, so a row, a column or a single rank is an O(1) lookup.
+    """
+
+    def __init__(self, districts, schemes, ranks, version):
+        self.districts = tuple(districts)
+        self.schemes = tuple(schemes)
+        self.index = {d: i for i, d in enumerate(self.districts)}
+        self.scheme_index = {s: j for j, s in enumerate(self.schemes)}
+        self.ranks = ranks
+        self.ranks.flags.writeable = False
+        self.version = version
+        # Ranks run 1..n_districts; districts missing from the CSV get the middle rank
+        self.n_districts = len(self.districts) or DEFAULT_N_DISTRICTS
+        self.middle_rank = (self.n_districts + 1) // 2
+        self.default_row = {s: self.middle_rank for s in (self.schemes or DEFAULT_RANK_COLUMNS)}
+        # Row dicts are built once per snapshot and shared; callers must not mutate them
+        self._rows = {d: dict(zip(self.schemes, row)) for d, row in zip(self.districts, self.ranks.tolist())}
+
+    def __len__(self):
+        return len(self.districts)
+
+    def row(self, district: str) -> dict:
+        return self._rows.get(district, self.default_row)
+
+    def rank(self, district: str, scheme: str) -> int:
+        i = self.index.get(district)
+        if i is None or scheme not in self.scheme_index:
+            return self.middle_rank
+        return int(self.ranks[i, self.scheme_index[scheme]])
+
+    def column(self, scheme: str) -> np.ndarray:
+        return self.ranks[:, self.scheme_index[scheme]]
+
+    def rank_matrix(self, districts, schemes=None) -> np.ndarray:
+        """Returns a (len(districts), len(schemes)) rank matrix, using the middle rank for unknown districts."""
+        schemes = tuple(schemes) if schemes is not None else self.schemes
+        matrix = np.full((len(districts), len(schemes)), self.middle_rank, dtype=np.int16)
+        ids = np.array([self.index.get(d, -1) for d in districts], dtype=np.int64)
+        known = ids >= 0
+        for j, scheme in enumerate(schemes):
+            if scheme in self.scheme_index:
+                matrix[known, j] = self.ranks[ids[known], self.scheme_index[scheme]]
+        return matrix
+
+    def as_dict(self) -> dict:
+        return self._rows
+
+
+def parse_rankings_csv(text: str, version: str = '') -> RankingSnapshot:
+    """Parses rankings CSV text: a 'district' column followed by integer rank columns."""
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if not header:
+        return RankingSnapshot([], DEFAULT_RANK_COLUMNS, np.zeros((0, len(DEFAULT_RANK_COLUMNS)), dtype=np.int16), version)
+    schemes = [h.strip() for h in header[1:]]
+    districts = []
+    rows = []
+    for record in reader:
+        if not record:
+            continue
+        districts.append(record[0].strip())
+        rows.append([int(v) for v in record[1:]])
+    ranks = np.array(rows, dtype=np.int16).reshape(len(rows), len(schemes))
+    return RankingSnapshot(districts, schemes, ranks, version)
+
+
+class RankingStore:
+    """
+    Rankings backed by a CSV file that reloads itself when the file changes.
+    The file's mtime is checked at most once per check_interval seconds, and a
+    reload swaps in a new snapshot, so readers never see a half-loaded table.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stat = None
+        self._last_check = 0.0
+        self._snapshot = None
+        self._snapshot = self._load()
+
+    def _load(self) -> RankingSnapshot:
+        """
+        Reads and parses the CSV. If the file is malformed (e.g. half copied), logs
+        it and keeps the previous snapshot; the file is retried on the next check.
+        """
+        try:
+            stat = os.stat(self.path)
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            self._stat = None
+            return parse_rankings_csv('', version='missing')
+        try:
+            snapshot = parse_rankings_csv(raw.decode('utf-8'), version=hashlib.sha1(raw).hexdigest())
+        except ValueError as e:
+            logger.warning("Ignoring malformed rankings file %s: %s", self.path, e)
+            if self._snapshot is not None:
+                return self._snapshot
+            return parse_rankings_csv('', version='invalid')
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def snapshot(self) -> RankingSnapshot:
+        """Returns the current snapshot, reloading first if the CSV has changed."""
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            with self._lock:
+                if now - self._last_check >= self.check_interval:
+                    self._last_check = now
+                    try:
+                        stat = os.stat(self.path)
+                        current = (stat.st_mtime_ns, stat.st_size)
+                    except FileNotFoundError:
+                        current = None
+                    if current != self._stat:
+                        self._snapshot = self._load()
+        return self._snapshot
+
+    def reload(self) -> RankingSnapshot:
+        """Forces a reload from disk."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            self._snapshot = self._load()
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        return self.snapshot().version
+
+    @property
+    def n_districts(self) -> int:
+        return self.snapshot().n_districts
+
+    def row(self, district: str) -> dict:
+        return self.snapshot().row(district)
+
+    def rank(self, district: str, scheme: str) -> int:
+        return self.snapshot().rank(district, scheme)
+
+    def column(self, scheme: str) -> np.ndarray:
+        return self.snapshot().column(scheme)
+
+    def rank_matrix(self, districts, schemes=None) -> np.ndarray:
+        return self.snapshot().rank_matrix(districts, schemes)
+
+    def as_dict(self) -> dict:
+        return self.snapshot().as_dict()
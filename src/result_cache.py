@@ -0,0 +1,198 @@
+"""
+Process-wide cache of panchayat analysis results, shared by every dashboard
+session.
+
+Memory tier: LRU bounded by an estimated byte size, with a TTL per entry.
+Disk tier (optional, RESULT_CACHE_DIR): a DiskCache that survives restarts;
+memory misses are filled from it before recomputing.
+Concurrent requests for the same key are coalesced, so only one of them
+computes and the rest wait for its result.
+
+Configuration: RESULT_CACHE_MAX_MB (default 64), RESULT_CACHE_TTL seconds
+(default 900) and RESULT_CACHE_DIR (unset = memory only).
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from src.disk_cache import DiskCache
+from src.telemetry import cache_result
+
+RESULT_CACHE_MAX_BYTES = int(float(os.environ.get('RESULT_CACHE_MAX_MB', 64)) * 1024 * 1024)
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 900))
+RESULT_CACHE_DIR = os.environ.get('RESULT_CACHE_DIR') or None
+DISK_NAMESPACE = 'analyses'
+
+
+def analysis_key(district: str, block: str, panchayat: str, scheme_inputs: dict, version: str = '') -> str:
+    """Cache key for one analysis. Include the rankings version so a rankings update invalidates it."""
+    return json.dumps([district, block, panchayat, sorted(scheme_inputs.items()), version], separators=(',', ':'))
+
+
+def deep_sizeof(value) -> int:
+    """Approximate memory footprint of a JSON-like value, including its contents."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_sizeof(v) for v in value)
+    return size
+
+
+class ResultCache:
+    """
+    Thread-safe LRU + TTL cache bounded by total entry size, with single-flight
+    computation and an optional on-disk second tier. Values must be
+    JSON-serializable when the disk tier is enabled.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, ttl: float = RESULT_CACHE_TTL, disk_dir: str = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = DiskCache(disk_dir) if disk_dir else None
+        self._data = OrderedDict() # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'coalesced': 0, 'expired': 0, 'evictions': 0}
+
+    def _get_memory(self, key):
+        """Returns the live in-memory value or None. Call with the lock held."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            self._bytes -= size
+            self._stats['expired'] += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _put_memory(self, key, value):
+        """Stores a value and evicts least recently used entries past max_bytes. Call with the lock held."""
+        size = deep_sizeof(value) + deep_sizeof(key)
+        if size > self.max_bytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._data[key] = (value, size, time.monotonic() + self.ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats['evictions'] += 1
+
+    def get(self, key):
+        """Returns the cached value from memory or disk, or None."""
+        with self._lock:
+            entry = self._get_memory(key)
+            if entry is not None:
+                self._stats['hits'] += 1
+                return entry[0]
+        if self.disk is not None:
+            value = self.disk.get(DISK_NAMESPACE, key, self.ttl)
+            if value is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._put_memory(key, value)
+                return value
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._put_memory(key, value)
+        if self.disk is not None:
+            self.disk.set(DISK_NAMESPACE, key, value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for key, calling compute() on a miss. If another
+        thread is already computing the same key, waits for its result instead.
+        Exceptions are passed to every waiter and nothing is cached.
+        """
+        with self._lock:
+            entry = self._get_memory(key)
+            if entry is not None:
+                self._stats['hits'] += 1
+                cache_result('analysis', hit=True)
+                return entry[0]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                owner = False
+            else:
+                future = self._in_flight[key] = Future()
+                owner = True
+        if not owner:
+            cache_result('analysis', hit=True)
+            return future.result()
+
+        try:
+            value = self.disk.get(DISK_NAMESPACE, key, self.ttl) if self.disk is not None else None
+            if value is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._put_memory(key, value)
+                cache_result('analysis', hit=True)
+            else:
+                with self._lock:
+                    self._stats['misses'] += 1
+                cache_result('analysis', hit=False)
+                value = compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def clear(self):
+        """Empties the memory tier. The disk tier is left alone."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Hit counts, hit ratio and memory footprint of the memory tier."""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['disk_hits'] + stats['misses'] + stats['coalesced']
+            served = lookups - stats['misses']
+            stats.update(
+                entries=len(self._data),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                hit_ratio=served / lookups if lookups else 0.0,
+            )
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats().get(DISK_NAMESPACE, {})
+        return stats
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Returns the shared analysis cache, configured from the environment."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL, RESULT_CACHE_DIR)
+    return _result_cache
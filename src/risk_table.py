@@ -0,0 +1,124 @@
+import argparse
+import threading
+
+import numpy as np
+
+from src.data_fetcher import RANKING_STORE
+from src.hierarchy import get_hierarchy
+from src.scoring import SCHEME_COLUMNS, default_scheme_matrix, score_arrays
+
+
+class RiskTable:
+    """
+    Materialized calculate_risk_score results for every panchayat, using the
+    rank-derived default scheme inputs. Rows are in hierarchy panchayat-id
+    order, so each district's panchayats are one contiguous slice. When the
+    rankings change, only districts whose rank row changed are recomputed.
+    """
+
+    def __init__(self, hierarchy, store):
+        self.hierarchy = hierarchy
+        self.store = store
+        n = len(hierarchy.panchayats)
+        self.risk_score = np.zeros(n, dtype=np.int16)
+        self.welfare_score = np.zeros(n, dtype=np.int16)
+        self.avg_rank = np.zeros(n, dtype=np.int16)
+        # Panchayat id range of each district: [offsets[d], offsets[d + 1])
+        self.district_offsets = hierarchy.block_offsets[hierarchy.district_offsets]
+        self.version = None
+        self.n_districts = None
+        self.rank_columns = None
+        self._district_ranks = None
+        self._lock = threading.Lock()
+        self.stats = {'refreshes': 0, 'districts_recomputed': 0}
+
+    def _recompute(self, district_id, ranks, n_districts, rank_columns):
+        lo, hi = self.district_offsets[district_id], self.district_offsets[district_id + 1]
+        rank_matrix = np.repeat(ranks[np.newaxis, :], hi - lo, axis=0)
+        scheme_matrix = default_scheme_matrix(rank_matrix, n_districts, rank_columns)
+        risk, welfare, avg_rank = score_arrays(scheme_matrix, rank_matrix, n_districts)
+        self.risk_score[lo:hi] = risk
+        self.welfare_score[lo:hi] = welfare
+        self.avg_rank[lo:hi] = avg_rank
+
+    def refresh(self) -> int:
+        """Brings the table up to date with the ranking store. Returns the number of districts recomputed."""
+        snapshot = self.store.snapshot()
+        if snapshot.version == self.version:
+            return 0
+        with self._lock:
+            if snapshot.version == self.version:
+                return 0
+            # Scored on every rank column in the rankings, like calculate_risk_score on snapshot rows
+            ranks = snapshot.rank_matrix(self.hierarchy.districts)
+            if (self._district_ranks is None or snapshot.n_districts != self.n_districts
+                    or snapshot.schemes != self.rank_columns):
+                # A change in the number of districts or schemes rescales every score
+                changed = np.arange(len(ranks))
+            else:
+                changed = np.flatnonzero(np.any(ranks != self._district_ranks, axis=1))
+            for d in changed:
+                self._recompute(d, ranks[d], snapshot.n_districts, snapshot.schemes)
+            self._district_ranks = ranks
+            self.n_districts = snapshot.n_districts
+            self.rank_columns = snapshot.schemes
+            self.version = snapshot.version
+            self.stats['refreshes'] += 1
+            self.stats['districts_recomputed'] += len(changed)
+            return len(changed)
+
+    def lookup(self, panchayat_id: int) -> tuple:
+        """Returns (risk_score, welfare_score, avg_rank) for a panchayat, like calculate_risk_score."""
+        self.refresh()
+        return int(self.risk_score[panchayat_id]), int(self.welfare_score[panchayat_id]), int(self.avg_rank[panchayat_id])
+
+    def to_frame(self):
+        """Returns the whole table as a DataFrame, one row per panchayat."""
+        import pandas as pd
+
+        self.refresh()
+        h = self.hierarchy
+        district_ids = h.block_district[h.panchayat_block]
+        defaults = default_scheme_matrix(self._district_ranks[district_ids], self.n_districts, self.rank_columns)
+        frame = pd.DataFrame({
+            'district': np.array(h.districts, dtype=object)[district_ids],
+            'block': np.array(h.blocks, dtype=object)[h.panchayat_block],
+            'panchayat': h.panchayats,
+        })
+        for j, scheme in enumerate(SCHEME_COLUMNS):
+            frame[scheme] = defaults[:, j]
+        frame['risk_score'] = self.risk_score
+        frame['welfare_score'] = self.welfare_score
+        frame['avg_rank'] = self.avg_rank
+        return frame
+
+
+_risk_table = None
+_risk_table_lock = threading.Lock()
+
+
+def get_risk_table() -> RiskTable:
+    """Returns the shared statewide risk table, building it on first use."""
+    global _risk_table
+    if _risk_table is None:
+        with _risk_table_lock:
+            if _risk_table is None:
+                _risk_table = RiskTable(get_hierarchy(), RANKING_STORE)
+    return _risk_table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the statewide panchayat risk table.")
+    parser.add_argument('output', help="Output .csv or .parquet file")
+    args = parser.parse_args(argv)
+
+    frame = get_risk_table().to_frame()
+    if args.output.lower().endswith('.parquet'):
+        frame.to_parquet(args.output, index=False)
+    else:
+        frame.to_csv(args.output, index=False)
+    print(f"Wrote {len(frame)} panchayats -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
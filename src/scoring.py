@@ -0,0 +1,179 @@
+import argparse
+import os
+
+import numpy as np
+
+from src.data_fetcher import RANKING_STORE
+from src.ranking_store import DEFAULT_N_DISTRICTS
+
+# --- Scoring Constants ---
+SCHEME_COLUMNS = ['magalir_urimai', 'old_age_pension', 'mgnrega', 'pongal_gift']
+RANK_COLUMNS = ['kalaignar_magalir_urimai_rank', 'old_age_pension_rank', 'mgnrega_rank', 'pongal_gift_rank']
+MAX_BENEFICIARIES_PER_SCHEME = 10000
+
+# Default beneficiary counts are derived from the district's rank in each scheme.
+# Lower rank (e.g., 1) means better performance, so we assign higher beneficiary counts.
+# Formula: Base + (Inverse Rank * Multiplier)
+DEFAULT_BASE_BENEFICIARIES = 500
+DEFAULT_MULTIPLIERS = {
+    'magalir_urimai': 150,  # Kalaignar Magalir Urimai Thittam (Rank 1 -> ~6000, Rank 38 -> ~500)
+    'old_age_pension': 50,  # Old Age Pension (Rank 1 -> ~2500, Rank 38 -> ~500)
+    'mgnrega': 200,         # MGNREGA (Rank 1 -> ~8000, Rank 38 -> ~500)
+    'pongal_gift': 300,     # Pongal Gift (Rank 1 -> ~12000, Rank 38 -> ~500)
+}
+
+
+def calculate_risk_score(data):
+    """
+    Calculates a risk score based on scheme beneficiaries and district rankings.
+    Score is from 0-100, where higher is riskier.
+    Ranks are normalized by data['n_districts'] (default 38), the number of ranked districts.
+    Every rank column in data['district_ranks'] is averaged, so rankings with
+    more or fewer schemes than the default four score the same way here and in
+    score_arrays.
+    """
+    scheme_inputs = data['scheme_inputs']
+    ranks = data['district_ranks']
+    n_districts = data.get('n_districts', DEFAULT_N_DISTRICTS)
+
+    # 1. Calculate Welfare Score (0-100, higher is better)
+    # Normalize beneficiary numbers against an assumed max of 10,000 per scheme
+    total_beneficiaries = sum(scheme_inputs.values())
+    max_possible_beneficiaries = len(scheme_inputs) * MAX_BENEFICIARIES_PER_SCHEME # 10k max per scheme
+    welfare_score = min(100, (total_beneficiaries / max_possible_beneficiaries) * 100 * 5) # Multiply by 5 to make it more sensitive
+
+    # 2. Calculate District Rank Score (0-100, higher is worse)
+    # Average the ranks (1-n_districts) and normalize to a 0-100 scale
+    avg_rank = sum(ranks.values()) / len(ranks)
+    # (avg_rank - 1) / (n_districts - 1) maps it to 0-1. Then scale to 100.
+    district_rank_score = ((avg_rank - 1) / max(n_districts - 1, 1)) * 100
+
+    # 3. Combine scores
+    # 60% weight to district performance, 40% to local beneficiary numbers.
+    # We subtract welfare_score because higher welfare LOWERS risk.
+    final_risk_score = (district_rank_score * 0.6) + ( (100 - welfare_score) * 0.4)
+
+    return max(0, min(100, int(final_risk_score))), int(welfare_score), int(avg_rank)
+
+
+def default_scheme_inputs(ranks: dict, n_districts: int = DEFAULT_N_DISTRICTS) -> dict:
+    """Returns the rank-derived default beneficiary counts used by the sidebar."""
+    middle_rank = (n_districts + 1) // 2
+    return {
+        scheme: int(DEFAULT_BASE_BENEFICIARIES + (n_districts + 1 - ranks.get(rank_col, middle_rank)) * DEFAULT_MULTIPLIERS[scheme])
+        for scheme, rank_col in zip(SCHEME_COLUMNS, RANK_COLUMNS)
+    }
+
+
+def default_scheme_matrix(rank_matrix, n_districts: int = DEFAULT_N_DISTRICTS, rank_columns=RANK_COLUMNS):
+    """
+    Vectorized default_scheme_inputs. rank_columns names the columns of
+    rank_matrix; scheme ranks it lacks take the middle rank, and extra columns
+    are ignored. Returns an (n, 4) matrix in SCHEME_COLUMNS order.
+    """
+    rank_matrix = np.asarray(rank_matrix, dtype=np.int64)
+    index = {c: j for j, c in enumerate(rank_columns)}
+    scheme_ranks = np.column_stack([
+        rank_matrix[:, index[c]] if c in index else np.full(len(rank_matrix), (n_districts + 1) // 2)
+        for c in RANK_COLUMNS
+    ])
+    multipliers = np.array([DEFAULT_MULTIPLIERS[s] for s in SCHEME_COLUMNS], dtype=np.int64)
+    return DEFAULT_BASE_BENEFICIARIES + (n_districts + 1 - scheme_ranks) * multipliers
+
+
+def score_arrays(scheme_matrix, rank_matrix, n_districts=DEFAULT_N_DISTRICTS):
+    """
+    Vectorized form of calculate_risk_score.
+    Takes (n, schemes) beneficiary and (n, ranks) rank matrices and returns
+    (risk_score, welfare_score, avg_rank) integer arrays. n_districts may be a
+    scalar or one value per row.
+    """
+    scheme_matrix = np.asarray(scheme_matrix)
+    rank_matrix = np.asarray(rank_matrix)
+
+    # Columns are added left to right so float inputs round exactly like sum()
+    total_beneficiaries = scheme_matrix[:, 0]
+    for i in range(1, scheme_matrix.shape[1]):
+        total_beneficiaries = total_beneficiaries + scheme_matrix[:, i]
+    max_possible_beneficiaries = scheme_matrix.shape[1] * MAX_BENEFICIARIES_PER_SCHEME
+    welfare_score = np.minimum(100, (total_beneficiaries / max_possible_beneficiaries) * 100 * 5)
+
+    rank_total = rank_matrix[:, 0]
+    for i in range(1, rank_matrix.shape[1]):
+        rank_total = rank_total + rank_matrix[:, i]
+    avg_rank = rank_total / rank_matrix.shape[1]
+    district_rank_score = ((avg_rank - 1) / np.maximum(np.asarray(n_districts) - 1, 1)) * 100
+
+    final_risk_score = (district_rank_score * 0.6) + ((100 - welfare_score) * 0.4)
+
+    # int() truncates towards zero, so np.trunc keeps the results identical
+    risk_score = np.clip(np.trunc(final_risk_score), 0, 100).astype(np.int64)
+    return risk_score, np.trunc(welfare_score).astype(np.int64), np.trunc(avg_rank).astype(np.int64)
+
+
+def score_table(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """
+    Scores a table of panchayats in one pass.
+    Expects the four scheme columns. Ranks are scored on the current rankings'
+    rank columns, which are looked up from the 'district' column when they are
+    not provided.
+    Returns a copy with risk_score, welfare_score and avg_rank columns added.
+    """
+    import pandas as pd
+
+    missing = [c for c in SCHEME_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing scheme columns: {', '.join(missing)}")
+
+    snapshot = RANKING_STORE.snapshot()
+    result = df.copy()
+    rank_columns = list(snapshot.schemes)
+    missing_ranks = [c for c in rank_columns if c not in result.columns]
+    if missing_ranks:
+        if 'district' not in result.columns:
+            raise ValueError("Need either the rank columns or a 'district' column to look them up.")
+        codes, districts = pd.factorize(result['district'])
+        # A blank district has code -1, which picks the extra last row: the middle rank, as for unknown districts
+        rank_matrix = snapshot.rank_matrix(list(districts) + [None], missing_ranks)[codes].astype(np.int64)
+        for j, col in enumerate(missing_ranks):
+            result[col] = rank_matrix[:, j]
+
+    risk, welfare, avg_rank = score_arrays(
+        result[SCHEME_COLUMNS].to_numpy(),
+        result[rank_columns].to_numpy(),
+        snapshot.n_districts
+    )
+    result['risk_score'] = risk
+    result['welfare_score'] = welfare
+    result['avg_rank'] = avg_rank
+    return result
+
+
+# --- Command Line Entry Point ---
+def _read_table(path):
+    import pandas as pd
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _write_table(df, path):
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch score a CSV/Parquet table of panchayats.")
+    parser.add_argument('input', help="Input .csv or .parquet file")
+    parser.add_argument('output', help="Output .csv or .parquet file")
+    args = parser.parse_args(argv)
+
+    scored = score_table(_read_table(args.input))
+    _write_table(scored, args.output)
+    print(f"Scored {len(scored)} panchayats -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
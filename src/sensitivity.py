@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.ranking_store import DEFAULT_N_DISTRICTS
+from src.scoring import SCHEME_COLUMNS, score_arrays
+
+# Score thresholds get_ai_reason uses for the moderate and high risk bands
+RISK_THRESHOLDS = (40, 65)
+
+
+def sweep_values(start: int, stop: int, steps: int) -> np.ndarray:
+    """Evenly spaced whole beneficiary counts from start to stop (inclusive)."""
+    return np.unique(np.linspace(start, stop, steps).round().astype(np.int64))
+
+
+def risk_grid(base_inputs: dict, ranks: dict, sweeps: dict, n_districts: int = DEFAULT_N_DISTRICTS) -> np.ndarray:
+    """
+    Evaluates calculate_risk_score over the grid of two swept scheme inputs in
+    one vectorized pass.
+    base_inputs holds all four scheme inputs; sweeps maps exactly two of those
+    schemes to 1-D arrays of values that replace them. Returns an int array of
+    shape (len(first sweep), len(second sweep)). To look at more schemes, fix
+    the others in base_inputs and sweep two at a time, so the grid stays 2-D.
+    """
+    if len(sweeps) != 2:
+        raise ValueError("Sweep exactly two schemes.")
+    unknown = set(sweeps) - set(SCHEME_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown schemes: {', '.join(sorted(unknown))}")
+
+    axes = [np.asarray(v) for v in sweeps.values()]
+    shape = tuple(len(a) for a in axes)
+    mesh = dict(zip(sweeps, (m.ravel() for m in np.meshgrid(*axes, indexing='ij'))))
+    size = int(np.prod(shape))
+
+    scheme_matrix = np.column_stack([
+        mesh[s] if s in mesh else np.full(size, base_inputs[s]) for s in SCHEME_COLUMNS
+    ])
+    rank_row = np.array(list(ranks.values()))
+    rank_matrix = np.broadcast_to(rank_row, (size, len(rank_row)))
+
+    risk, _, _ = score_arrays(scheme_matrix, rank_matrix, n_districts)
+    return risk.reshape(shape)
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Set VILLAGE_DATA_URL to enable real fetches; without it fetch_village_data keeps using mock values.
+DATA_URL_ENV = 'VILLAGE_DATA_URL'
+CACHE_DIR_ENV = 'VILLAGE_DATA_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('TMPDIR', '/tmp'), 'village_data_cache')
+
+HOUR = 60 * 60
+
+
+# --- Sources ---
+class DataSource:
+    """
+    One upstream data source.
+    Subclasses set name, path and ttl (seconds), and implement parse().
+    district_level sources are cached once per district instead of per panchayat.
+    """
+    name = None
+    path = None
+    ttl = HOUR
+    district_level = False
+
+    def params(self, district: str, block: str, panchayat: str) -> dict:
+        if self.district_level:
+            return {'district': district}
+        return {'district': district, 'block': block, 'panchayat': panchayat}
+
+    def cache_key(self, district: str, block: str, panchayat: str) -> str:
+        return '|'.join(self.params(district, block, panchayat).values())
+
+    def parse(self, text: str, district: str, block: str, panchayat: str) -> dict:
+        raise NotImplementedError
+
+
+class MgnregaSource(DataSource):
+    """Panchayat job card and wage report (an HTML table)."""
+    name = 'mgnrega'
+    path = '/mgnrega/report'
+    ttl = 6 * HOUR
+
+    def parse(self, text, district, block, panchayat):
+        from bs4 import BeautifulSoup
+
+        rows = {}
+        for tr in BeautifulSoup(text, 'html.parser').select('table#report tr'):
+            cells = [td.get_text(strip=True) for td in tr.find_all('td')]
+            if len(cells) >= 3:
+                rows[cells[0]] = cells
+        # Fall back to the block total when the panchayat isn't listed
+        row = rows.get(panchayat) or rows.get('Total')
+        if row is None:
+            raise ValueError(f"No MGNREGA row for {panchayat}")
+        return {'active_cards': int(row[1].replace(',', '')), 'avg_wage': float(row[2].replace(',', ''))}
+
+
+class WelfareSource(DataSource):
+    """Pension and Magalir Urimai coverage counts (JSON)."""
+    name = 'welfare'
+    path = '/welfare/coverage'
+    ttl = 24 * HOUR
+
+    def parse(self, text, district, block, panchayat):
+        data = json.loads(text)
+        return {'pension_coverage': int(data['pension_coverage']), 'magalir_coverage': int(data['magalir_coverage'])}
+
+
+class CropYieldSource(DataSource):
+    """District crop yield anomaly in percent (JSON)."""
+    name = 'crop_yield'
+    path = '/agri/yield'
+    ttl = 7 * 24 * HOUR
+    district_level = True
+
+    def parse(self, text, district, block, panchayat):
+        return {'yield_anomaly': int(json.loads(text)['yield_anomaly'])}
+
+
+class MarketPriceSource(DataSource):
+    """District commodity price trend (JSON)."""
+    name = 'market_prices'
+    path = '/agri/prices'
+    ttl = HOUR
+    district_level = True
+
+    def parse(self, text, district, block, panchayat):
+        return {'price_trend': str(json.loads(text)['price_trend'])}
+
+
+DEFAULT_SOURCES = (MgnregaSource(), WelfareSource(), CropYieldSource(), MarketPriceSource())
+
+
+# --- Pipeline ---
+class FetchPipeline:
+    """
+    Fetches every source for a panchayat concurrently and merges the results.
+    HTTP goes through one pooled session with timeouts and retries, and each
+    source's parsed response is cached on disk for that source's TTL. If a
+    source fails, its last cached value is used even if expired; if there is
+    none, its fields are left out. Concurrent misses for the same source and
+    cache key are coalesced into one upstream request, so panchayats of one
+    district share a district-level fetch.
+    """
+
+    def __init__(self, base_url: str, cache_dir: str = DEFAULT_CACHE_DIR, sources=DEFAULT_SOURCES,
+                 timeout: float = 5.0, retries: int = 3, max_workers: int = 16):
+        self.base_url = base_url.rstrip('/')
+        self.sources = tuple(sources)
+        self.timeout = timeout
+        self.cache = DiskCache(cache_dir)
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _fetch_source(self, source, district, block, panchayat) -> dict:
+        key = source.cache_key(district, block, panchayat)
+        cached = self.cache.get(source.name, key, source.ttl)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get((source.name, key))
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                future = self._in_flight[(source.name, key)] = Future()
+                owner = True
+        if not owner:
+            return future.result()
+
+        try:
+            value = self._request_source(source, key, district, block, panchayat)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop((source.name, key), None)
+
+    def _request_source(self, source, key, district, block, panchayat) -> dict:
+        """Requests and parses one source, falling back to its stale cache entry on failure."""
+        # A request that finished between our cache miss and taking ownership has already stored the value
+        cached = self.cache.get(source.name, key, source.ttl, count=False)
+        if cached is not None:
+            return cached
+        try:
+            response = self.session.get(self.base_url + source.path,
+                                        params=source.params(district, block, panchayat), timeout=self.timeout)
+            response.raise_for_status()
+            value = source.parse(response.text, district, block, panchayat)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            logger.warning("Source %s failed for %s: %s", source.name, key, e)
+            return self.cache.get_stale(source.name, key) or {}
+        self.cache.set(source.name, key, value)
+        return value
+
+    def fetch(self, district: str, block: str, panchayat: str) -> dict:
+        """Returns the merged indicators from all sources."""
+        futures = [self._executor.submit(self._fetch_source, s, district, block, panchayat) for s in self.sources]
+        indicators = {}
+        for future in futures:
+            indicators.update(future.result())
+        return indicators
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline():
+    """Returns the shared pipeline, or None if VILLAGE_DATA_URL isn't set."""
+    global _pipeline
+    base_url = os.environ.get(DATA_URL_ENV)
+    if not base_url:
+        return None
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = FetchPipeline(base_url, os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR))
+    return _pipeline
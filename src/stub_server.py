@@ -0,0 +1,113 @@
+"""
+Local stand-in for the upstream data sources, serving the files in
+src/fixtures/ so the fetch pipeline can run without network access.
+
+    python -m src.stub_server --port 8765 --latency 0.05 --fail-rate 0.1
+    VILLAGE_DATA_URL=http://127.0.0.1:8765 streamlit run app.py
+
+GET /_stats returns request counts per path.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# path -> (fixture file, kind)
+ROUTES = {
+    '/mgnrega/report': ('mgnrega_report.html', 'html'),
+    '/welfare/coverage': ('welfare.json', 'json'),
+    '/agri/yield': ('crop_yield.json', 'json'),
+    '/agri/prices': ('market_prices.json', 'json'),
+}
+
+
+def _load_fixtures():
+    fixtures = {}
+    for path, (filename, kind) in ROUTES.items():
+        with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as f:
+            fixtures[path] = Template(f.read()) if kind == 'html' else json.load(f)
+    return fixtures
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server that answers source requests from fixtures, with optional latency and failures."""
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.0, fail_rate: float = 0.0):
+        super().__init__(address, _StubHandler)
+        self.fixtures = _load_fixtures()
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, path):
+        with self._lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        server = self.server
+        if url.path == '/_stats':
+            with server._lock:
+                return self._send(200, json.dumps(server.counts))
+        if url.path not in ROUTES:
+            return self._send(404, json.dumps({'error': 'not found'}))
+
+        server.count(url.path)
+        if server.latency:
+            time.sleep(server.latency)
+        if server.fail_rate and random.random() < server.fail_rate:
+            return self._send(503, json.dumps({'error': 'unavailable'}))
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        fixture = server.fixtures[url.path]
+        if isinstance(fixture, Template):
+            return self._send(200, fixture.safe_substitute(params), 'text/html')
+        return self._send(200, json.dumps(fixture.get(params.get('district'), fixture['_default'])))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0, fail_rate: float = 0.0) -> StubServer:
+    """Starts the stub server on a background thread. Use port 0 for any free port."""
+    server = StubServer(('127.0.0.1', port), latency, fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve data source fixtures locally.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args(argv)
+
+    server = StubServer(('127.0.0.1', args.port), args.latency, args.fail_rate)
+    print(f"Stub data server on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
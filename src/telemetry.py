@@ -0,0 +1,255 @@
+"""
+Lightweight tracing for the dashboard's hot path.
+
+Enable with TN_ATLAS_METRICS=1. Spans are aggregated into histograms and
+served in Prometheus text format on http://0.0.0.0:$TN_ATLAS_METRICS_PORT/metrics
+(default 9464). Any rerun slower than TN_ATLAS_SLOW_RERUN_MS (default 1000)
+is logged as one JSON line with its per-span breakdown.
+
+When disabled, traced() returns the function unchanged and span() returns a
+shared no-op context manager, so the cost is one attribute lookup per call.
+"""
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('TN_ATLAS_METRICS', '').lower() in ('1', 'true', 'yes')
+METRICS_PORT = int(os.environ.get('TN_ATLAS_METRICS_PORT', 9464))
+SLOW_RERUN_SECONDS = float(os.environ.get('TN_ATLAS_SLOW_RERUN_MS', 1000)) / 1000
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1) # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Process-wide span histograms and cache counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = {}
+        self.reruns = Histogram()
+        self.cache_calls = {}
+        self.cache_misses = {}
+
+    def observe_span(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.spans.get(name)
+            if histogram is None:
+                histogram = self.spans[name] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_rerun(self, seconds: float):
+        with self._lock:
+            self.reruns.observe(seconds)
+
+    def count_cache(self, name: str, calls: int = 0, misses: int = 0):
+        with self._lock:
+            self.cache_calls[name] = self.cache_calls.get(name, 0) + calls
+            self.cache_misses[name] = self.cache_misses.get(name, 0) + misses
+
+    def render(self) -> str:
+        """Returns all metrics in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP tn_atlas_span_seconds Time spent in a dashboard section or data function.",
+                "# TYPE tn_atlas_span_seconds histogram",
+            ]
+            for name, histogram in sorted(self.spans.items()):
+                lines += _histogram_lines('tn_atlas_span_seconds', histogram, f'span="{name}"')
+            lines += [
+                "# HELP tn_atlas_rerun_seconds Wall time of a full dashboard script run.",
+                "# TYPE tn_atlas_rerun_seconds histogram",
+            ]
+            lines += _histogram_lines('tn_atlas_rerun_seconds', self.reruns, '')
+            lines += [
+                "# HELP tn_atlas_cache_requests_total Cached function calls by result.",
+                "# TYPE tn_atlas_cache_requests_total counter",
+            ]
+            for name in sorted(self.cache_calls):
+                misses = self.cache_misses.get(name, 0)
+                hits = max(0, self.cache_calls[name] - misses)
+                lines.append(f'tn_atlas_cache_requests_total{{cache="{name}",result="hit"}} {hits}')
+                lines.append(f'tn_atlas_cache_requests_total{{cache="{name}",result="miss"}} {misses}')
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric, histogram, labels):
+    sep = ',' if labels else ''
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{metric}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{labels}{sep}le="+Inf"}} {histogram.count}')
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{metric}_sum{suffix} {histogram.sum}')
+    lines.append(f'{metric}_count{suffix} {histogram.count}')
+    return lines
+
+
+REGISTRY = Registry()
+_rerun_state = threading.local()
+
+
+# --- Spans ---
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        REGISTRY.observe_span(self.name, elapsed)
+        breakdown = getattr(_rerun_state, 'spans', None)
+        if breakdown is not None:
+            breakdown.append((self.name, elapsed))
+        return False
+
+
+def span(name: str):
+    """Times a block: `with span('choropleth'): ...`."""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name)
+
+
+def traced(name: str = None):
+    """Decorator that times every call of a function as a span."""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Cache Tracking ---
+def track_cache(name: str):
+    """
+    Counts calls of a cached function. Put it outside st.cache_data and call
+    cache_miss(name) inside the cached body; hits are calls minus misses.
+    """
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            REGISTRY.count_cache(name, calls=1)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_miss(name: str):
+    if ENABLED:
+        REGISTRY.count_cache(name, misses=1)
+
+
+def cache_result(name: str, hit: bool):
+    """Records one lookup for caches that know whether they hit."""
+    if ENABLED:
+        REGISTRY.count_cache(name, calls=1, misses=0 if hit else 1)
+
+
+# --- Reruns ---
+def start_rerun():
+    """Marks the start of a dashboard script run. Starts the metrics server on first use."""
+    if not ENABLED:
+        return
+    start_metrics_server()
+    _rerun_state.start = time.perf_counter()
+    _rerun_state.spans = []
+
+
+def end_rerun(**context):
+    """Records the rerun's duration and logs a JSON line if it was slow."""
+    if not ENABLED or getattr(_rerun_state, 'start', None) is None:
+        return
+    elapsed = time.perf_counter() - _rerun_state.start
+    spans = _rerun_state.spans
+    _rerun_state.start = None
+    _rerun_state.spans = None
+    REGISTRY.observe_rerun(elapsed)
+    if elapsed > SLOW_RERUN_SECONDS:
+        logger.warning(json.dumps({
+            'event': 'slow_rerun',
+            'duration_ms': round(elapsed * 1000, 1),
+            'threshold_ms': round(SLOW_RERUN_SECONDS * 1000, 1),
+            'spans': [{'name': n, 'ms': round(s * 1000, 2)} for n, s in spans],
+            **context,
+        }))
+
+
+# --- Metrics Endpoint ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = None):
+    """Serves /metrics on a background thread, once per process."""
+    global _server
+    if _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(('0.0.0.0', port or METRICS_PORT), _MetricsHandler)
+            except OSError as e:
+                logger.warning("Metrics endpoint not started: %s", e)
+                _server = False
+                return _server
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from src.data_fetcher import RANKING_STORE
+from src.loan_book import _init_worker, score_chunk
+from src.scoring import SCHEME_COLUMNS, default_scheme_inputs
+
+
+def test_score_chunk_keeps_supplied_scheme_columns():
+    snapshot = RANKING_STORE.snapshot()
+    _init_worker(list(snapshot.districts), snapshot.rank_matrix(snapshot.districts), snapshot.n_districts, snapshot.schemes)
+    chunk = pd.DataFrame({'district': ['Madurai', 'Nowhere'], 'block': ['a', 'b'], 'panchayat': ['p', 'q'], 'mgnrega': [5, 7]})
+    scored, _ = score_chunk(chunk)
+    assert scored['mgnrega'].tolist() == [5, 7]
+    for i, district in enumerate(chunk['district']):
+        defaults = default_scheme_inputs(snapshot.row(district), snapshot.n_districts)
+        assert [scored[s][i] for s in SCHEME_COLUMNS if s != 'mgnrega'] == [defaults[s] for s in SCHEME_COLUMNS if s != 'mgnrega']
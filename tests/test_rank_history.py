@@ -0,0 +1,30 @@
+import numpy as np
+
+from src.rank_history import RankHistory
+
+
+def test_append_adds_split_districts_and_new_schemes(tmp_path):
+    history = RankHistory.create(str(tmp_path), ['Vellore', 'Madurai'], ['mgnrega_rank'])
+    history.append('2026-01', {'Vellore': {'mgnrega_rank': 1}, 'Madurai': {'mgnrega_rank': 2}})
+
+    # Vellore splits off Ranipet, and a scheme is added
+    history.append('2026-02', {
+        'Vellore': {'mgnrega_rank': 2, 'free_bus_travel_rank': 3},
+        'Madurai': {'mgnrega_rank': 1, 'free_bus_travel_rank': 1},
+        'Ranipet': {'mgnrega_rank': 3, 'free_bus_travel_rank': 2},
+    })
+    history.append('2026-03', {'Ranipet': {'mgnrega_rank': 1}})
+
+    reopened = RankHistory(str(tmp_path))
+    assert reopened.months.tolist() == [202601, 202602, 202603]
+    assert reopened.districts == ('Vellore', 'Madurai', 'Ranipet')
+    assert reopened.schemes == ('mgnrega_rank', 'free_bus_travel_rank')
+    np.testing.assert_array_equal(reopened.series('Vellore', 'mgnrega_rank')[1], [1, 2, np.nan])
+    np.testing.assert_array_equal(reopened.series('Ranipet', 'mgnrega_rank')[1], [np.nan, 3, 1])
+    np.testing.assert_array_equal(reopened.series('Madurai', 'free_bus_travel_rank')[1], [np.nan, 1, np.nan])
+
+    snapshot = reopened.snapshot_as_of('2026-01')
+    assert snapshot.districts == ('Vellore', 'Madurai')
+    assert snapshot.row('Madurai') == {'mgnrega_rank': 2}
+    # The pre-split files are replaced by the widened generation
+    assert sorted(p.name for p in tmp_path.glob('*.i16')) == ['free_bus_travel_rank.g1.i16', 'mgnrega_rank.g1.i16']
@@ -0,0 +1,82 @@
+import math
+import random
+
+import numpy as np
+
+from src.ranking_engine import RankingEngine, load_coverage_csv, write_rankings
+from src.ranking_store import RankingStore
+
+SCHEMES = ['mgnrega', 'old_age_pension', 'pongal_gift']
+
+
+def _full_sort_ranks(coverage, districts, scheme):
+    """Reference ranks from a full re-sort: ties share the better rank, missing figures rank last."""
+    values = {d: v for d, v in coverage[scheme].items() if d in districts}
+    ordered = sorted(values.values(), reverse=True)
+    ranks = {}
+    for d in districts:
+        if d in values:
+            ranks[d] = ordered.index(values[d]) + 1
+        else:
+            ranks[d] = len(ordered) + 1
+    return ranks
+
+
+def _check(engine, coverage, districts):
+    snapshot = engine.snapshot()
+    assert snapshot.districts == tuple(districts)
+    assert snapshot.schemes == engine.rank_columns
+    for j, scheme in enumerate(SCHEMES):
+        expected = _full_sort_ranks(coverage, districts, scheme)
+        assert snapshot.ranks[:, j].tolist() == [expected[d] for d in districts], scheme
+
+
+def test_incremental_updates_match_a_full_re_sort():
+    rng = random.Random(0)
+    engine = RankingEngine(SCHEMES)
+    coverage = {s: {} for s in SCHEMES}
+    districts = []
+    names = [f"District {i}" for i in range(20)]
+    for step in range(2000):
+        action = rng.random()
+        if action < 0.05 and districts:
+            district = rng.choice(districts)
+            engine.remove_district(district)
+            districts.remove(district)
+            for s in SCHEMES:
+                coverage[s].pop(district, None)
+        else:
+            district = rng.choice(names)
+            scheme = rng.choice(SCHEMES)
+            # A small value set makes ties common; None and NaN clear the figure
+            value = rng.choice([None, math.nan] + [rng.randint(0, 5) * 0.5 for _ in range(6)])
+            engine.update(district, scheme, value)
+            if district not in districts:
+                districts.append(district)
+            if value is None or math.isnan(value):
+                coverage[scheme].pop(district, None)
+            else:
+                coverage[scheme][district] = float(value)
+        _check(engine, coverage, districts)
+
+
+def test_ties_share_the_better_rank_and_missing_rank_last():
+    engine = RankingEngine(['mgnrega'])
+    engine.update_row('A', {'mgnrega': 5})
+    engine.update_row('B', {'mgnrega': 9})
+    engine.update_row('C', {'mgnrega': 5})
+    engine.update_row('D', {'mgnrega': None})
+    engine.update_row('E', {'mgnrega': 1})
+    assert [engine.rank(d, 'mgnrega') for d in 'ABCDE'] == [2, 1, 2, 5, 4]
+    engine.update('B', 'mgnrega', 5)
+    assert [engine.rank(d, 'mgnrega') for d in 'ABCDE'] == [1, 1, 1, 5, 4]
+
+
+def test_cli_round_trip_reads_back_through_the_store(tmp_path):
+    coverage = tmp_path / 'coverage.csv'
+    coverage.write_text("district,mgnrega,pongal_gift\nA,0.5,\nB,0.9,0.2\nC,0.5,0.7\n")
+    output = tmp_path / 'rankings.csv'
+    write_rankings(load_coverage_csv(str(coverage)), str(output))
+    snapshot = RankingStore(str(output)).snapshot()
+    assert snapshot.schemes == ('mgnrega_rank', 'pongal_gift_rank')
+    np.testing.assert_array_equal(snapshot.ranks, [[2, 3], [1, 2], [2, 1]])
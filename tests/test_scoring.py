@@ -0,0 +1,125 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_fetcher import RANKING_STORE
+from src.scoring import (RANK_COLUMNS, SCHEME_COLUMNS, calculate_risk_score, default_scheme_inputs,
+                         default_scheme_matrix, score_arrays, score_table)
+
+
+def _random_records(n, seed=0):
+    rng = random.Random(seed)
+    districts = list(RANKING_STORE.snapshot().districts) + ['Unknown District']
+    return [
+        {
+            'district': rng.choice(districts),
+            'scheme_inputs': {s: rng.randint(0, 12000) for s in SCHEME_COLUMNS},
+        }
+        for _ in range(n)
+    ]
+
+
+def test_score_arrays_matches_calculate_risk_score():
+    records = _random_records(2000)
+    for r in records:
+        r['district_ranks'] = RANKING_STORE.row(r['district'])
+    risk, welfare, avg_rank = score_arrays(
+        [[r['scheme_inputs'][s] for s in SCHEME_COLUMNS] for r in records],
+        [[r['district_ranks'][c] for c in RANK_COLUMNS] for r in records],
+    )
+    expected = [calculate_risk_score(r) for r in records]
+    assert list(zip(risk.tolist(), welfare.tolist(), avg_rank.tolist())) == expected
+
+
+def test_score_table_looks_up_district_ranks():
+    records = _random_records(2000, seed=1)
+    df = pd.DataFrame([dict(r['scheme_inputs'], district=r['district']) for r in records])
+    scored = score_table(df)
+    expected = [
+        calculate_risk_score({'scheme_inputs': r['scheme_inputs'], 'district_ranks': RANKING_STORE.row(r['district'])})
+        for r in records
+    ]
+    assert list(zip(scored['risk_score'], scored['welfare_score'], scored['avg_rank'])) == expected
+
+
+def test_score_table_blank_district_gets_middle_rank(tmp_path):
+    records = _random_records(200, seed=3)
+    for r in records[::10]:
+        r['district'] = ''
+    path = tmp_path / 'panchayats.csv'
+    pd.DataFrame([dict(r['scheme_inputs'], district=r['district']) for r in records]).to_csv(path, index=False)
+    # Read back like the CLI does, so blank districts arrive as NaN
+    scored = score_table(pd.read_csv(path))
+    expected = [
+        calculate_risk_score({'scheme_inputs': r['scheme_inputs'], 'district_ranks': RANKING_STORE.row(r['district'])})
+        for r in records
+    ]
+    assert list(zip(scored['risk_score'], scored['welfare_score'], scored['avg_rank'])) == expected
+
+
+@pytest.mark.parametrize('n_districts', [2, 12, 38, 55])
+def test_non_default_district_count(n_districts):
+    rng = np.random.default_rng(n_districts)
+    ranks = rng.integers(1, n_districts + 1, size=(500, len(RANK_COLUMNS)))
+    schemes = rng.integers(0, 12000, size=(500, len(SCHEME_COLUMNS)))
+    risk, welfare, avg_rank = score_arrays(schemes, ranks, n_districts)
+    for i in range(len(ranks)):
+        data = {
+            'scheme_inputs': dict(zip(SCHEME_COLUMNS, schemes[i].tolist())),
+            'district_ranks': dict(zip(RANK_COLUMNS, ranks[i].tolist())),
+            'n_districts': n_districts,
+        }
+        assert calculate_risk_score(data) == (risk[i], welfare[i], avg_rank[i])
+
+
+def test_default_scheme_matrix_matches_default_scheme_inputs():
+    ranks = np.random.default_rng(0).integers(1, 39, size=(100, len(RANK_COLUMNS)))
+    matrix = default_scheme_matrix(ranks)
+    for row, rank_row in zip(matrix.tolist(), ranks.tolist()):
+        assert row == [default_scheme_inputs(dict(zip(RANK_COLUMNS, rank_row)))[s] for s in SCHEME_COLUMNS]
+
+
+@pytest.mark.parametrize('columns', [
+    RANK_COLUMNS + ['free_bus_travel_rank'],
+    RANK_COLUMNS[:3],
+])
+def test_risk_table_matches_calculate_risk_score_for_other_scheme_counts(tmp_path, monkeypatch, columns):
+    from src.hierarchy import get_hierarchy
+    from src.ranking_store import RankingStore
+    from src.risk_table import RiskTable
+
+    hierarchy = get_hierarchy()
+    rng = np.random.default_rng(len(columns))
+    # One district left out, so its panchayats fall back to the middle rank
+    districts = list(hierarchy.districts[1:])
+    path = tmp_path / 'rankings.csv'
+    lines = [','.join(['district'] + columns)]
+    lines += [','.join([d] + [str(int(v)) for v in rng.integers(1, len(districts) + 1, len(columns))]) for d in districts]
+    path.write_text('\n'.join(lines) + '\n')
+    store = RankingStore(str(path))
+    snapshot = store.snapshot()
+    assert snapshot.schemes == tuple(columns)
+
+    table = RiskTable(hierarchy, store)
+    district_ids = hierarchy.block_district[hierarchy.panchayat_block]
+    for p in range(0, len(hierarchy.panchayats), 7):
+        district = hierarchy.districts[district_ids[p]]
+        ranks = snapshot.row(district)
+        data = {
+            'scheme_inputs': default_scheme_inputs(ranks, snapshot.n_districts),
+            'district_ranks': ranks,
+            'n_districts': snapshot.n_districts,
+        }
+        assert table.lookup(p) == calculate_risk_score(data), district
+
+    monkeypatch.setattr('src.scoring.RANKING_STORE', store)
+    records = _random_records(500, seed=2)
+    scored = score_table(pd.DataFrame([dict(r['scheme_inputs'], district=r['district']) for r in records]))
+    expected = [
+        calculate_risk_score({'scheme_inputs': r['scheme_inputs'], 'district_ranks': snapshot.row(r['district']),
+                              'n_districts': snapshot.n_districts})
+        for r in records
+    ]
+    assert list(zip(scored['risk_score'], scored['welfare_score'], scored['avg_rank'])) == expected